@@ -1,4 +1,5 @@
 import random
+from itertools import groupby
 from finite_automaton import FiniteAutomaton
 
 class Grammar:
@@ -7,14 +8,51 @@ class Grammar:
         self.VT = VT
         self.P = P
         self.S = S
-    
+        self.compile_productions()
+
+    def compile_productions(self):
+        # nonterminals get the ids below len(VN), runs of terminals the ids above,
+        # productions are kept reversed so they can be pushed on the derivation stack
+        nonterminals = sorted(self.VN)
+        ids = {v: i for i, v in enumerate(nonterminals)}
+        self._symbols = list(nonterminals)
+
+        def tokenize(production):
+            tokens = []
+            for is_nonterminal, group in groupby(production, lambda symbol: symbol in self.VN):
+                if is_nonterminal:
+                    tokens.extend(ids[v] for v in group)
+                else:
+                    run = "".join(group)
+                    if run not in ids:
+                        ids[run] = len(self._symbols)
+                        self._symbols.append(run)
+                    tokens.append(ids[run])
+            return tuple(reversed(tokens))
+
+        self._productions = [[tokenize(production) for production in self.P.get(v, [])] for v in nonterminals]
+        self._start = tokenize(self.S)
+
+    def _derive(self, rng):
+        productions, symbols, nonterminals = self._productions, self._symbols, len(self.VN)
+        choice = rng.choice
+        stack = list(self._start)
+        string = []
+        while stack:
+            symbol = stack.pop()
+            if symbol < nonterminals:
+                stack.extend(choice(productions[symbol]))
+            else:
+                string.append(symbols[symbol])
+        return "".join(string)
+
     def generate_string(self):
-        string = self.S
-        while any(v in string for v in self.VN):
-            for v in string:
-                if v in self.VN:
-                    string = string.replace(v, random.choice(self.P[v]), 1)
-        return string
+        return self._derive(random)
+
+    def generate_many(self, n, seed=None):
+        rng = random.Random(seed)
+        for _ in range(n):
+            yield self._derive(rng)
     
     def to_finite_automaton(self):
         q = self.VN
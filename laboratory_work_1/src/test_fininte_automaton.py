@@ -22,5 +22,23 @@ class TestFiniteAutomaton(unittest.TestCase):
         self.assertTrue(finiteAutomaton.string_belong_to_language('adea'))
         self.assertTrue(finiteAutomaton.string_belong_to_language('abbbbbbbbbbbbbbda'))
 
+    def test_generate_many(self):
+        VN = {'S', 'P', 'Q'}
+        VT = {'a', 'b', 'c', 'd', 'e', 'f'}
+        P = {
+            'S': ['aP', 'bQ'],
+            'P': ['bP', 'cP', 'dQ', 'e'],
+            'Q': ['eQ', 'fQ', 'a']
+        }
+        S = 'S'
+        grammar = Grammar(VN, VT, P, S)
+        finiteAutomaton = grammar.to_finite_automaton()
+
+        strings = list(grammar.generate_many(200, seed=7))
+        self.assertEqual(len(strings), 200)
+        self.assertEqual(strings, list(grammar.generate_many(200, seed=7)))
+        for string in strings:
+            self.assertTrue(finiteAutomaton.string_belong_to_language(string))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
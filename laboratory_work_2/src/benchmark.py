@@ -0,0 +1,357 @@
+import io
+import os
+import random
+import string
+import tempfile
+import time
+from corpus_validation import validate_corpus
+from finite_automaton import FiniteAutomaton
+from grammar import Grammar
+from sample_generation import write_samples
+
+
+def lab_1_automaton():
+    """The finite automaton obtained from the first lab's grammar."""
+    return FiniteAutomaton(
+        q={"S", "Q", "P"},
+        sigma={"e", "a", "b", "d", "f", "c"},
+        delta={
+            "S": [("a", "P"), ("b", "Q")],
+            "P": [("b", "P"), ("c", "P"), ("d", "Q"), ("e",)],
+            "Q": [("e", "Q"), ("f", "Q"), ("a",)]
+        },
+        q0="S",
+        f=["e", "a"],
+    )
+
+
+def random_nfa(rng, states, sigma="ab", density=1.5):
+    """A random non-deterministic automaton, every state has about `density` transitions per symbol."""
+    q = [f"q{i}" for i in range(states)]
+    delta = {}
+    for state in q:
+        for symbol in sigma:
+            for target in rng.sample(q, min(states, int(density + rng.random()))):
+                delta.setdefault(state, []).append((symbol, target))
+    return FiniteAutomaton(set(q), set(sigma), delta, q[0], rng.sample(q, max(1, states // 3)))
+
+
+def keyword_nfa(rng, keywords, sigma=string.ascii_letters, length=(3, 8)):
+    """A non-deterministic automaton for the strings ending in one of `keywords` random words.
+    The initial state loops on every symbol and guesses where the word starts.
+    """
+    q, delta, f = ["start"], {"start": [(symbol, "start") for symbol in sigma]}, []
+    for number in range(keywords):
+        previous = "start"
+        word = "".join(rng.choice(sigma) for _ in range(rng.randint(*length)))
+        for position, symbol in enumerate(word):
+            state = f"w{number}_{position}"
+            q.append(state)
+            delta.setdefault(previous, []).append((symbol, state))
+            previous = state
+        f.append(previous)
+    return FiniteAutomaton(set(q), set(sigma), delta, "start", f)
+
+
+def nth_last_nfa(n, sigma="ab"):
+    """A non-deterministic automaton for the strings whose n-th symbol from the end is the first of sigma.
+    Its deterministic version needs 2 ** n states.
+    """
+    symbols = sorted(sigma)
+    delta = {"0": [(symbol, "0") for symbol in symbols] + [(symbols[0], "1")]}
+    for state in range(1, n):
+        delta[str(state)] = [(symbol, str(state + 1)) for symbol in symbols]
+    return FiniteAutomaton({str(state) for state in range(n + 1)}, set(sigma), delta, "0", [str(n)])
+
+
+def frozenset_to_dfa(automaton):
+    """The original subset construction, rescanning the transitions of every member for every symbol."""
+    if automaton.is_deterministic():
+        return automaton
+    new_states = {frozenset([automaton.q0]): automaton.q0}
+    new_delta = {}
+    dfa_start_state = frozenset([automaton.q0])
+    unexplored = [dfa_start_state]
+    dfa_final_states = set()
+    while unexplored:
+        current_state_set = unexplored.pop()
+        for input_symbol in sorted(automaton.sigma):
+            next_states = set()
+            for state in current_state_set:
+                for symbol, next_state in automaton.delta.get(state, []):
+                    if symbol == input_symbol:
+                        next_states.add(next_state)
+            if next_states:
+                next_state_set = frozenset(next_states)
+                if next_state_set not in new_states:
+                    new_states[next_state_set] = str(len(new_states))
+                    unexplored.append(next_state_set)
+                new_delta.setdefault(new_states[current_state_set], []).append((input_symbol, new_states[next_state_set]))
+        if any(state in automaton.f for state in current_state_set):
+            dfa_final_states.add(new_states[current_state_set])
+    return FiniteAutomaton(set(new_states.values()), automaton.sigma, new_delta, new_states[dfa_start_state], list(dfa_final_states))
+
+
+def moore_minimized_size(automaton):
+    """Amount of states after naive pairwise (Moore) minimization of the compiled table.
+    Marks every pair of reachable states that some string tells apart, repeating until nothing changes.
+    """
+    automaton.compile()
+    width, table = automaton._width, automaton._table
+    symbols = range(len(automaton._codes))
+    reachable = [automaton._start]
+    for state in reachable:
+        for column in symbols:
+            target = table[state * width + column] // width
+            if target not in reachable:
+                reachable.append(target)
+    final = {state: (automaton._accepting >> state) & 1 for state in reachable}
+    distinct = {(p, q) for p in reachable for q in reachable if final[p] != final[q]}
+    changed = True
+    while changed:
+        changed = False
+        for p in reachable:
+            for q in reachable:
+                if p < q and (p, q) not in distinct:
+                    for column in symbols:
+                        if (table[p * width + column] // width, table[q * width + column] // width) in distinct:
+                            distinct.add((p, q))
+                            distinct.add((q, p))
+                            changed = True
+                            break
+    # Every state whose pairs with all smaller states are distinct represents its own class
+    return sum(1 for i, p in enumerate(reachable) if all((p, q) in distinct for q in reachable[:i]))
+
+
+def scan_string_belong_to_language(automaton, inputString):
+    """The original membership check, scanning the transition list of the current state for every character."""
+    currentState = automaton.q0
+    for c in inputString:
+        if c not in automaton.sigma:
+            return False
+        for transition in automaton.delta[currentState]:
+            if c == transition[0]:
+                if len(transition) == 2:
+                    currentState = transition[1]
+                    break
+                else:
+                    currentState = transition[0]
+    return currentState in automaton.f
+
+
+def replace_generate_string(grammar):
+    """The original string generation, rescanning and rebuilding the whole string for every replacement."""
+    string = grammar.S
+    while any(v in string for v in grammar.VN):
+        for v in string:
+            if v in grammar.VN:
+                string = string.replace(v, random.choice(grammar.P[v]), 1)
+    return string
+
+
+def timed(function, *args, repeat=3):
+    """Run the function `repeat` times and return its result together with the best elapsed time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def benchmark_string_belong_to_language(length=5_000_000):
+    """Compare the compiled membership check with the transition list scan on a long input."""
+    automaton = lab_1_automaton()
+    rng = random.Random(0)
+    # Keep the input inside the language so both methods read every character
+    inputString = "a" + "".join(rng.choice("bc") for _ in range(length)) + "dea"
+
+    scan_result, scan_time = timed(scan_string_belong_to_language, automaton, inputString)
+    automaton.compile()
+    compiled_result, compiled_time = timed(automaton.string_belong_to_language, inputString)
+    assert scan_result == compiled_result
+
+    print(f"string_belong_to_language on {len(inputString):,} characters")
+    print(f"  transition scan: {scan_time:.3f}s ({len(inputString) / scan_time / 1e6:.1f} M chars/s)")
+    print(f"  compiled table:  {compiled_time:.3f}s ({len(inputString) / compiled_time / 1e6:.1f} M chars/s)")
+    print(f"  speedup:         {scan_time / compiled_time:.1f}x")
+
+
+def benchmark_accepts_many(count=1_000_000):
+    """Compare batched membership testing with a loop over string_belong_to_language."""
+    automaton = lab_1_automaton().compile()
+    rng = random.Random(0)
+    strings = ["a" + "".join(rng.choice("bcde") for _ in range(rng.randint(0, 20))) + rng.choice(["a", "e", ""]) for _ in range(count)]
+
+    loop_result, loop_time = timed(lambda: [automaton.string_belong_to_language(string) for string in strings])
+    batch_result, batch_time = timed(automaton.accepts_many, strings)
+    assert loop_result == batch_result.tolist()
+
+    print(f"membership of {count:,} strings")
+    print(f"  string_belong_to_language loop: {loop_time:.3f}s ({count / loop_time / 1e6:.2f} M strings/s)")
+    print(f"  accepts_many:                   {batch_time:.3f}s ({count / batch_time / 1e6:.2f} M strings/s)")
+    print(f"  speedup:                        {loop_time / batch_time:.1f}x")
+
+
+def benchmark_validate_corpus(count=4_000_000, chunk_size=1 << 22):
+    """Measure corpus validation throughput for a growing amount of worker processes."""
+    automaton = lab_1_automaton()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "corpus.txt")
+        with open(path, "w") as file:
+            for _ in range(count):
+                file.write("a" + "".join(rng.choice("bcde") for _ in range(rng.randint(0, 20))) + rng.choice(["a", "e", ""]) + "\n")
+        size = os.path.getsize(path)
+
+        print(f"validate_corpus on {count:,} lines ({size / 2 ** 20:.0f} MiB)")
+        workers, baseline = 1, None
+        while workers <= (os.cpu_count() or 1):
+            accepted, elapsed = timed(lambda: sum(result["accepted"] for result in validate_corpus(automaton, path, workers, chunk_size)), repeat=1)
+            baseline = baseline or elapsed
+            print(f"  {workers:>2} workers: {elapsed:.3f}s ({size / elapsed / 2 ** 20:.0f} MiB/s, {baseline / elapsed:.1f}x), {accepted:,} accepted")
+            workers *= 2
+
+
+def benchmark_minimize(sizes=(10, 14, 18, 20)):
+    """Compare Hopcroft minimization with naive pairwise minimization on determinized random automata."""
+    rng = random.Random(0)
+    print("minimize on determinized random automata")
+    for states in sizes:
+        dfa = random_nfa(rng, states).to_dfa()
+        minimized, hopcroft_time = timed(dfa.minimize, repeat=1)
+        moore_size, moore_time = timed(moore_minimized_size, dfa, repeat=1)
+        assert len(minimized.q) == moore_size
+        print(f"  NFA {states:>2} states -> DFA {len(dfa.q):>5} -> minimal {len(minimized.q):>5}: "
+              f"Hopcroft {hopcroft_time:.3f}s, pairwise {moore_time:.3f}s ({moore_time / hopcroft_time:.0f}x)")
+
+
+def benchmark_to_dfa():
+    """Compare the bitset subset construction with the original frozenset based one."""
+    rng = random.Random(0)
+    automata = [(f"ending in one of {count} words", keyword_nfa(rng, count)) for count in (100, 300)]
+    automata += [(f"{n}-th symbol from the end", nth_last_nfa(n, "abcd")) for n in (10, 13)]
+    print("to_dfa")
+    for description, nfa in automata:
+        dfa, bitset_time = timed(nfa.to_dfa, repeat=1)
+        original, frozenset_time = timed(frozenset_to_dfa, nfa, repeat=1)
+        assert dfa.delta == original.delta
+        print(f"  {description}: NFA {len(nfa.q)} states, {len(nfa.sigma)} symbols -> DFA {len(dfa.q)} states: "
+              f"bitsets {bitset_time:.3f}s, frozensets {frozenset_time:.3f}s ({frozenset_time / bitset_time:.1f}x)")
+
+
+def benchmark_lazy_dfa(count=2_000, length=200, max_states=1 << 12):
+    """Check strings against automata whose full DFA has 2 ** n states, lazily and, while it fits, with the full DFA."""
+    rng = random.Random(0)
+    strings = ["".join(rng.choice("ab") for _ in range(length)) for _ in range(count)]
+    print(f"membership of {count:,} strings of {length} symbols, lazy DFA caching up to {max_states:,} states")
+    for n, build in ((12, True), (14, True), (30, False)):
+        nfa = nth_last_nfa(n)
+        lazy = nfa.lazy_dfa(max_states)
+        lazy_result, lazy_time = timed(lambda: [lazy.string_belong_to_language(string) for string in strings], repeat=1)
+        print(f"  {n}-th symbol from the end ({2 ** n:,} DFA states): lazy {lazy_time:.3f}s, {lazy}")
+        if build:
+            dfa, dfa_time = timed(nfa.to_dfa, repeat=1)
+            dfa.compile()
+            dfa_result, check_time = timed(lambda: [dfa.string_belong_to_language(string) for string in strings], repeat=1)
+            assert lazy_result == dfa_result
+            print(f"    full DFA: {dfa_time:.3f}s to build, then {check_time:.3f}s to check")
+
+
+def benchmark_generate_string(count=2_000):
+    """Compare the precompiled string generation with the original replace based one."""
+    grammars = [
+        ("first lab's grammar", Grammar({"S", "P", "Q"}, set("abcdef"), {"S": ["aP", "bQ"], "P": ["bP", "cP", "dQ", "e"], "Q": ["eQ", "fQ", "a"]})),
+        ("long derivations", Grammar({"S"}, {"a", "b"}, {"S": ["aS"] * 499 + ["b"]})),
+    ]
+    print(f"generation of {count:,} strings")
+    for description, grammar in grammars:
+        strings, replace_time = timed(lambda: [replace_generate_string(grammar) for _ in range(count)], repeat=1)
+        compiled, compiled_time = timed(lambda: list(grammar.generate_many(count)), repeat=1)
+        average = sum(map(len, compiled)) / count
+        print(f"  {description} (about {average:.0f} characters): replace {replace_time:.3f}s, "
+              f"precompiled {compiled_time:.3f}s ({replace_time / compiled_time:.1f}x)")
+
+
+def benchmark_classification(productions=2_000, edits=2_000):
+    """Compare keeping the grammar type up to date while editing with classifying the whole grammar again."""
+    rng = random.Random(0)
+    VN = {f"N{i}" for i in range(10)} | set(string.ascii_uppercase)
+    VT = set(string.ascii_lowercase)
+    keys = sorted(string.ascii_uppercase)
+    P = {}
+    for _ in range(productions):
+        P.setdefault(rng.choice(keys), []).append(rng.choice(string.ascii_lowercase) * rng.randint(1, 8) + rng.choice(keys))
+    grammar = Grammar(VN, VT, P)
+    changes = [(rng.choice(keys), rng.choice(keys) + rng.choice(string.ascii_lowercase)) for _ in range(edits)]
+
+    def edit(classify):
+        types = []
+        for key, production in changes:
+            grammar.add_production(key, production)
+            types.append(classify())
+            grammar.remove_production(key, production)
+            types.append(classify())
+        return types
+
+    incremental, incremental_time = timed(edit, lambda: grammar.type, repeat=1)
+    full, full_time = timed(edit, grammar.compute_type, repeat=1)
+    assert incremental == full
+    print(f"grammar type after {2 * edits:,} edits of a grammar with {productions:,} productions")
+    print(f"  cached type:  {incremental_time:.3f}s")
+    print(f"  compute_type: {full_time:.3f}s ({full_time / incremental_time:.0f}x)")
+
+
+def benchmark_write_samples(count=1_000_000, shard_size=1 << 15):
+    """Measure compressed sample generation throughput for a growing amount of worker processes."""
+    grammar = Grammar({"S", "P", "Q"}, set("abcdef"), {"S": ["aP", "bQ"], "P": ["bP", "cP", "dQ", "e"], "Q": ["eQ", "fQ", "a"]})
+    print(f"write_samples of {count:,} strings")
+    with tempfile.TemporaryDirectory() as directory:
+        workers, baseline, contents = 1, None, None
+        while workers <= (os.cpu_count() or 1):
+            path = os.path.join(directory, f"samples_{workers}.txt.gz")
+            _, elapsed = timed(write_samples, grammar, path, count, 0, workers, shard_size, repeat=1)
+            with open(path, "rb") as file:
+                data = file.read()
+            contents = contents or data
+            assert data == contents
+            baseline = baseline or elapsed
+            print(f"  {workers:>2} workers: {elapsed:.3f}s ({count / elapsed / 1e6:.2f} M strings/s, {baseline / elapsed:.1f}x)")
+            workers *= 2
+
+
+def benchmark_write_dot(states=20_000, sigma=string.ascii_lowercase):
+    """Compare `write_dot` with building the `Digraph` of `visualize` and its source, on a random DFA whose states
+    split the alphabet into a few runs of letters leading to the same target.
+    """
+    rng = random.Random(0)
+    q = [str(i) for i in range(states)]
+    delta = {}
+    for state in q:
+        cuts = sorted(rng.sample(range(1, len(sigma)), 3))
+        for first, last in zip([0] + cuts, cuts + [len(sigma)]):
+            target = rng.choice(q)
+            delta.setdefault(state, []).extend((symbol, target) for symbol in sigma[first:last])
+    automaton = FiniteAutomaton(set(q), set(sigma), delta, q[0], rng.sample(q, states // 10))
+    source, visualize_time = timed(lambda: automaton.visualize().source, repeat=1)
+    file = io.StringIO()
+    _, write_time = timed(automaton.write_dot, file, repeat=1)
+    neighborhood = io.StringIO()
+    written, neighborhood_time = timed(automaton.write_dot, neighborhood, None, 2, repeat=1)
+    print(f"DOT source of a DFA with {states:,} states and {states * len(sigma):,} transitions")
+    print(f"  visualize: {visualize_time:.2f}s, {len(source) / 1e6:.1f} MB")
+    print(f"  write_dot: {write_time:.2f}s, {len(file.getvalue()) / 1e6:.1f} MB ({visualize_time / write_time:.0f}x)")
+    print(f"  write_dot 2 steps around the initial state: {neighborhood_time:.4f}s, {written} states")
+
+
+if __name__ == "__main__":
+    benchmark_string_belong_to_language()
+    benchmark_accepts_many()
+    benchmark_validate_corpus()
+    benchmark_minimize()
+    benchmark_to_dfa()
+    benchmark_lazy_dfa()
+    benchmark_generate_string()
+    benchmark_classification()
+    benchmark_write_samples()
+    benchmark_write_dot()
@@ -0,0 +1,86 @@
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+# Default amount of bytes validated by one task
+CHUNK_SIZE = 1 << 26
+
+# The compiled automaton of the current worker process, set once by `_initialize_worker`
+_automaton = None
+
+
+def _initialize_worker(automaton):
+    """Compile the automaton once per worker process, tasks only carry byte ranges."""
+    global _automaton
+    _automaton = automaton.compile()
+
+
+def split_ranges(path, chunk_size=CHUNK_SIZE):
+    """Split a file of newline-separated strings into byte ranges of about `chunk_size` bytes.
+    Every range except possibly the last ends right after a newline, so no line is cut in two.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            newline = data.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def validate_range(automaton, data, start=0):
+    """Validate every line of a bytes-like object holding newline-separated strings.
+
+    Returns a dictionary with the amount of lines, the amount of accepted lines and the byte offsets of the
+    accepted lines, counted from `start`.
+    """
+    data = bytes(data)
+    # A final line without a newline still counts, a trailing newline does not start a new line
+    ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+    if len(data) > 0 and data[-1:] != b"\n":
+        ends = np.append(ends, len(data))
+    offsets = np.concatenate(([0], ends[:-1] + 1)) if len(ends) else ends
+    lines = data.decode("utf-8").split("\n")[:len(ends)]
+    accepted = automaton.accepts_many(lines)
+    return {
+        "start": start,
+        "end": start + len(data),
+        "lines": len(lines),
+        "accepted": int(accepted.sum()),
+        "offsets": offsets[accepted] + start,
+    }
+
+
+def _validate_file_range(path, start, end):
+    """Worker task: validate the lines of a byte range of the memory-mapped file."""
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return validate_range(_automaton, data[start:end], start)
+
+
+def validate_corpus(automaton, path, workers=None, chunk_size=CHUNK_SIZE):
+    """Validate a file of newline-separated strings against the automaton using a pool of processes.
+
+    The file is split into byte ranges on line boundaries and every range is validated by a worker that
+    memory-maps the file itself. The automaton is sent to each worker only once, when the worker starts.
+    Yields the result of every range, as returned by `validate_range`, in file order while the following
+    ranges are still being validated.
+    """
+    ranges = split_ranges(path, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(automaton,)) as executor:
+        # Keep a bounded amount of ranges in flight, so results are streamed instead of piling up
+        pending = deque()
+        for start, end in ranges:
+            pending.append(executor.submit(_validate_file_range, path, start, end))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
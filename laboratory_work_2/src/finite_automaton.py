@@ -1,6 +1,68 @@
+from array import array
+from collections import OrderedDict
+from operator import itemgetter
+import numpy as np
 from graphviz import Digraph
 
 
+# Strings at least this long are run chunk-wise through NumPy instead of one character at a time
+SPECULATIVE_MIN_LENGTH = 1 << 16
+# Above this many states, running every chunk from every state costs more than it saves
+SPECULATIVE_MAX_STATES = 32
+# Default amount of subset states a `LazyDFA` keeps
+LAZY_MAX_STATES = 4096
+# Misses a string needs before a full `LazyDFA` cache may be considered to be thrashing
+LAZY_MIN_MISSES = 32
+# Number of blocks every chunk advances through in lockstep
+SPECULATIVE_CHUNK_LENGTH = 1024
+# Characters are read in blocks of up to this many, as long as the block table stays below the size limit
+SPECULATIVE_MAX_BLOCK_LENGTH = 8
+SPECULATIVE_MAX_TABLE_SIZE = 1 << 16
+# Amount of DOT lines gathered before every write by `write_dot`
+DOT_LINES_PER_WRITE = 10_000
+# Reserved name of the invisible node the arrow to the initial state starts from in `write_dot`
+DOT_START_NODE = "__start__"
+
+
+def successor_sets(moves, state_set, width):
+    """Function that unions the targets of every member of a bitset of NFA states, symbol by symbol.
+    `moves` is the per state dictionary from symbol index to target bitmask built by `FiniteAutomaton._index_nfa`.
+    """
+    next_state_sets = [0] * width
+    members = state_set
+    while members:
+        lowest = members & -members
+        for column, targets in moves[lowest.bit_length() - 1].items():
+            next_state_sets[column] |= targets
+        members ^= lowest
+    return next_state_sets
+
+
+def symbol_ranges(symbols):
+    """Function that writes a set of symbols as a short label, runs of consecutive characters becoming ranges.
+    For example {"a", "b", "c", "d", "x"} gives "a-d,x". Symbols longer than one character are listed as they are.
+    """
+    characters = sorted(symbol for symbol in symbols if len(symbol) == 1)
+    parts = []
+    i = 0
+    while i < len(characters):
+        j = i
+        while j + 1 < len(characters) and ord(characters[j + 1]) == ord(characters[j]) + 1:
+            j += 1
+        if j - i >= 2:
+            parts.append(f"{characters[i]}-{characters[j]}")
+        else:
+            parts.extend(characters[i:j + 1])
+        i = j + 1
+    parts.extend(sorted(symbol for symbol in symbols if len(symbol) != 1))
+    return ",".join(parts)
+
+
+def dot_quote(name):
+    """Function that quotes a name or a label for DOT."""
+    return '"' + str(name).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
 class FiniteAutomaton:
     def __init__(self, q, sigma, delta, q0, f):
         self.q = q
@@ -8,6 +70,7 @@ class FiniteAutomaton:
         self.delta = delta
         self.q0 = q0
         self.f = f
+        self._table = None  # Dense transition table, built lazily by `compile`
 
     def __str__(self):
         """Printable representation of the Finite Automaton"""
@@ -15,19 +78,195 @@ class FiniteAutomaton:
     
     def string_belong_to_language(self, inputString):
         """Method for checking if a string belongs to the language of the finite automaton."""
-        currentState = self.q0
-        for c in inputString:
-            if c not in self.sigma:
-                return False
-            for transition in self.delta[currentState]:
-                if c == transition[0]:
-                    if len(transition) == 2:
-                        currentState = transition[1]
-                        break
-                    else:
-                        currentState = transition[0]
-        return currentState in self.f
+        if self._table is None:
+            self.compile()
+        if self._lookup is not None and len(inputString) >= SPECULATIVE_MIN_LENGTH and len(self._states) < SPECULATIVE_MAX_STATES:
+            return self._speculative_belong_to_language(inputString)
+        table, codes = self._table, self._codes
+        state = self._start
+        try:
+            for c in inputString:
+                state = table[state + codes[c]]
+        except KeyError:
+            # The character is not part of the alphabet
+            return False
+        return (self._accepting >> (state // self._width)) & 1 == 1
+
+    def compile(self):
+        """Method for compiling the finite automaton into a dense transition table.
+
+        The automaton is determinized first, then every state gets an index and every symbol of sigma a
+        column. The table is stored row by row in an `array`, with each entry already multiplied by the row
+        width, so a transition is the single lookup `table[state + codes[symbol]]`. An extra last row is a
+        dead, non-accepting state looping on every symbol, and every missing transition leads to it, so a
+        string needing a transition the automaton doesn't have is rejected. The final states are kept as a
+        bitmask over the state indices.
+        Call it again after editing `q`, `sigma`, `delta` or `f` in place.
+        """
+        dfa = self if self.is_deterministic() else self.to_dfa()
+        states, symbols, moves, accepting = dfa._index_nfa()
+        width = max(len(symbols), 1)
+
+        codes = {symbol: column for column, symbol in enumerate(symbols)}
+        dead = len(states)
+        table = array("q", [dead * width]) * ((dead + 1) * width)
+        for state, row in enumerate(moves):
+            for column, targets in row.items():
+                table[state * width + column] = (targets.bit_length() - 1) * width
+
+        self._table = table
+        self._codes = codes
+        self._width = width
+        self._start = 0
+        self._accepting = accepting
+        self._states = states
+        # Column of every character for the NumPy paths. Latin-1 characters index it directly,
+        # any other code point lands on its last entry, which is outside of sigma. Symbols longer than
+        # one character can't be read from a string one character at a time, so they only get the
+        # pure Python path and `_lookup` stays None
+        self._lookup = None
+        if all(len(symbol) == 1 for symbol in codes):
+            self._lookup = np.full(max(max(map(ord, codes), default=0) + 2, 256), -1, dtype=np.int8 if width < 127 else np.int32)
+            for symbol, column in codes.items():
+                self._lookup[ord(symbol)] = column
+        self._numpy_table = None
+        self._block_numpy_table = None
+        return self
+
+    def _columns(self, inputString):
+        """Method that maps every character of the string to its column in the compiled table, -1 outside of sigma."""
+        try:
+            points = np.frombuffer(inputString.encode("latin-1"), dtype=np.uint8)
+        except UnicodeEncodeError:
+            points = np.minimum(np.frombuffer(inputString.encode("utf-32-le"), dtype=np.uint32), len(self._lookup) - 1)
+        return self._lookup[points]
+
+    def _encode(self, inputString):
+        """Method that maps every character of the string to its column in the compiled table.
+        Returns None if the string contains a character outside of sigma.
+        """
+        columns = self._columns(inputString)
+        if (columns < 0).any():
+            return None
+        return columns
+
+    def _step_table(self):
+        """Method returning the compiled table as a flat NumPy array with an extra padding column `width`,
+        which maps every state to itself. Like the `array` table, entries are row offsets.
+        """
+        if self._numpy_table is None:
+            width = self._width
+            rows = len(self._table) // width
+            step = np.empty((rows, width + 1), dtype=np.intp)
+            step[:, :width] = np.frombuffer(self._table, dtype=np.int64).reshape(rows, width) // width
+            step[:, width] = np.arange(rows)
+            self._numpy_table = (step * (width + 1)).ravel()
+        return self._numpy_table
+
+    def _block_table(self):
+        """Method returning the compiled table extended to blocks of several characters, as a NumPy array.
+
+        A block of `k` columns, padding included, is numbered in base `width + 1` with the first character
+        most significant, and its entry is the state reached after reading the whole block. Entries are row
+        offsets. Returns the flattened table, the block length and the number of block columns.
+        """
+        if self._block_numpy_table is None:
+            width = self._width + 1
+            step = self._step_table().reshape(-1, width) // width
+            rows = len(step)
+
+            block, block_length = step, 1
+            while block_length < SPECULATIVE_MAX_BLOCK_LENGTH and block.size * width <= SPECULATIVE_MAX_TABLE_SIZE:
+                block = step[block].reshape(rows, -1)
+                block_length += 1
+            self._block_numpy_table = ((block * block.shape[1]).ravel(), block_length, block.shape[1])
+        return self._block_numpy_table
+
+    def _to_blocks(self, columns):
+        """Method that numbers every run of `k` table columns along the last axis as a column of the block table.
+        The length of the last axis must be a multiple of the block length.
+        """
+        block_length = self._block_table()[1]
+        columns = columns.reshape(*columns.shape[:-1], -1, block_length)
+        blocks = columns[..., 0].astype(np.intp)
+        for position in range(1, block_length):
+            blocks *= self._width + 1
+            blocks += columns[..., position]
+        return blocks
+
+    def _speculative_belong_to_language(self, inputString):
+        """Method for checking membership of a long string.
+
+        The string is read in blocks of characters and cut into chunks that are all advanced together,
+        one NumPy gather per block, starting from every state at once. Chaining the resulting per-chunk
+        state mappings gives the final state.
+        """
+        columns = self._encode(inputString)
+        if columns is None:
+            return False
+        table, block_length, block_columns = self._block_table()
+        rows = len(table) // block_columns
+
+        padded = np.full(-(-len(columns) // block_length) * block_length, self._width, dtype=np.intp)
+        padded[:len(columns)] = columns
+        blocks = self._to_blocks(padded)
+
+        # Pad to whole chunks with the all-padding block, which is the last column
+        chunks = -(-len(blocks) // SPECULATIVE_CHUNK_LENGTH)
+        padded = np.full(chunks * SPECULATIVE_CHUNK_LENGTH, block_columns - 1, dtype=np.intp)
+        padded[:len(blocks)] = blocks
+        by_block = np.ascontiguousarray(padded.reshape(chunks, SPECULATIVE_CHUNK_LENGTH).T)
+
+        states = np.tile(np.arange(rows, dtype=np.intp) * block_columns, (chunks, 1))
+        for block in by_block:
+            states = table[states + block[:, None]]
+
+        state = self._start
+        for mapping in (states // block_columns).tolist():
+            state = mapping[state]
+        return (self._accepting >> state) & 1 == 1
     
+    def accepts_many(self, strings, batch_size=1 << 16):
+        """Method for checking a whole collection of strings at once, returns a NumPy array of booleans.
+
+        Batch by batch, the strings are sorted by length and packed into a padded matrix of table columns,
+        one row per string. All rows then advance through the compiled table in lockstep, one NumPy gather
+        per column, and rows drop out of the gather once their string has been read. With symbols longer
+        than one character the strings are sequences of symbols and are checked one at a time instead.
+        """
+        if self._table is None:
+            self.compile()
+        strings = list(strings)
+        if self._lookup is None:
+            return np.array([self.string_belong_to_language(string) for string in strings], dtype=bool)
+        table = self._step_table()
+        width = self._width + 1
+        accepting = np.array([(self._accepting >> state) & 1 for state in range(len(self._table) // self._width)], dtype=bool)
+
+        result = np.zeros(len(strings), dtype=bool)
+        for first in range(0, len(strings), batch_size):
+            batch = strings[first:first + batch_size]
+            lengths = np.fromiter(map(len, batch), dtype=np.intp, count=len(batch))
+            order = np.argsort(lengths, kind="stable")
+            lengths = lengths[order]
+            if len(batch) > 1:
+                batch = itemgetter(*order.tolist())(batch)
+
+            # Filling the padded matrix through a mask writes the joined strings row after row
+            matrix = np.full((len(batch), int(lengths.max(initial=0))), self._width, dtype=self._lookup.dtype)
+            matrix[np.arange(matrix.shape[1]) < lengths[:, None]] = self._columns("".join(batch))
+
+            # Strings with a character outside of sigma are rejected; pad them so the lookup stays in range
+            foreign = (matrix < 0).any(axis=1)
+            matrix[foreign] = self._width
+
+            states = np.full(len(batch), self._start * width, dtype=np.intp)
+            for position, column in enumerate(np.ascontiguousarray(matrix.T)):
+                active = np.searchsorted(lengths, position, side="right")
+                states[active:] = table[states[active:] + column[active:]]
+            result[first + order] = accepting[states // width] & ~foreign
+        return result
+
     def to_regular_grammar(self):
         """Method for converting the finite automaton to a regular grammar."""
         VN = self.q
@@ -44,30 +283,55 @@ class FiniteAutomaton:
         }
         return grammar_dict
     
+    def _index_nfa(self):
+        """Method for indexing the finite automaton as a non-deterministic one.
+
+        Returns the state names, the sorted symbols, and for every state index a dictionary from symbol
+        index to the bitmask of its target states, plus the bitmask of the final states.
+        A transition of the form (symbol,) moves to the state named by the symbol itself.
+        """
+        states = [self.q0]
+        index = {self.q0: 0}
+        for state in sorted(set(self.q) | set(self.delta) | {transition[-1] for transitions in self.delta.values() for transition in transitions}, key=str):
+            if state not in index:
+                index[state] = len(states)
+                states.append(state)
+        symbols = sorted(self.sigma)
+        codes = {symbol: column for column, symbol in enumerate(symbols)}
+
+        moves = [{} for _ in states]
+        for state, transitions in self.delta.items():
+            row = moves[index[state]]
+            for transition in transitions:
+                column = codes[transition[0]]
+                row[column] = row.get(column, 0) | 1 << index[transition[-1]]
+        final = 0
+        for state in self.f:
+            if state in index:
+                final |= 1 << index[state]
+        return states, symbols, moves, final
+
     def to_dfa(self):
-        """Method for converting the finite automaton to a deterministic finite automaton."""
+        """Method for converting the finite automaton to a deterministic finite automaton.
+
+        Sets of states are int bitsets over the indexed states, and a successor set is the union of the
+        precomputed target bitmasks of the members, so each member is visited once per DFA state.
+        """
         if self.is_deterministic():
             return self
-        
-        new_states = {frozenset([self.q0]): self.q0}  # Mapping from NFA state sets to DFA state names
+
+        states, symbols, moves, final = self._index_nfa()
+        dfa_start_state = 1 << 0
+        new_states = {dfa_start_state: self.q0}  # Mapping from NFA state bitsets to DFA state names
         new_delta = {}
-        dfa_start_state = frozenset([self.q0])
         unexplored = [dfa_start_state]
         dfa_final_states = set()
 
         while unexplored:
             current_state_set = unexplored.pop()
-            for input_symbol in sorted(self.sigma):
-                # Find all NFA states reachable from the current state set under the input symbol
-                next_states = set()
-                for state in current_state_set:
-                    transitions = self.delta.get(state, [])
-                    for symbol, next_state in transitions:
-                        if symbol == input_symbol:
-                            next_states.add(next_state)
-
-                if next_states:
-                    next_state_set = frozenset(next_states)
+            next_state_sets = successor_sets(moves, current_state_set, len(symbols))
+            for input_symbol, next_state_set in zip(symbols, next_state_sets):
+                if next_state_set:
                     if next_state_set not in new_states:
                         new_states[next_state_set] = str(len(new_states))
                         unexplored.append(next_state_set)
@@ -75,7 +339,7 @@ class FiniteAutomaton:
                     new_delta.setdefault(new_states[current_state_set], []).append((input_symbol, new_states[next_state_set]))
 
             # Check if the current state set includes any NFA final states
-            if any(state in self.f for state in current_state_set):
+            if current_state_set & final:
                 dfa_final_states.add(new_states[current_state_set])
 
         # Convert set of states back to a list format for compatibility
@@ -83,7 +347,82 @@ class FiniteAutomaton:
         new_f = list(dfa_final_states)
 
         return FiniteAutomaton(new_q, self.sigma, new_delta, new_states[dfa_start_state], new_f)
-        
+
+    def minimize(self):
+        """Method for minimizing the finite automaton with Hopcroft's partition refinement algorithm.
+
+        Works on the compiled table, where every state has a transition for every symbol, so the result
+        accepts exactly the strings `string_belong_to_language` accepts. Unreachable states are dropped and
+        the remaining ones are split, starting from final and non-final, by the blocks their predecessors
+        lead into, using inverse transition lists. Returns a new complete automaton with the states named
+        "0", "1", ... in the order they are reached from the initial state.
+        """
+        if self._table is None:
+            self.compile()
+        width = self._width
+        symbols = sorted(self._codes, key=self._codes.get)
+
+        # Index the reachable states in breadth-first order
+        order, index = [self._start], {self._start: 0}
+        for state in order:
+            for column in range(len(symbols)):
+                target = self._table[state * width + column] // width
+                if target not in index:
+                    index[target] = len(order)
+                    order.append(target)
+        delta = [[index[self._table[state * width + column] // width] for column in range(len(symbols))] for state in order]
+        inverse = [[[] for _ in order] for _ in symbols]
+        for state, targets in enumerate(delta):
+            for column, target in enumerate(targets):
+                inverse[column][target].append(state)
+
+        final = {state for state, original in enumerate(order) if (self._accepting >> original) & 1}
+        blocks = [block for block in (set(final), set(range(len(order))) - final) if block]
+        block_of = [0] * len(order)
+        for number, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = number
+
+        # Only the smaller of the two initial blocks needs to be a splitter
+        smallest = min(range(len(blocks)), key=lambda number: len(blocks[number]))
+        waiting = {(smallest, column) for column in range(len(symbols))} if len(blocks) == 2 else set()
+        while waiting:
+            splitter, column = waiting.pop()
+            # Group the predecessors of the splitter by the block they are in
+            touched = {}
+            for target in blocks[splitter]:
+                for state in inverse[column][target]:
+                    touched.setdefault(block_of[state], []).append(state)
+            for number, states in touched.items():
+                if len(states) == len(blocks[number]):
+                    continue
+                blocks[number].difference_update(states)
+                new = len(blocks)
+                blocks.append(set(states))
+                for state in states:
+                    block_of[state] = new
+                for symbol in range(len(symbols)):
+                    if (number, symbol) in waiting:
+                        waiting.add((new, symbol))
+                    else:
+                        waiting.add((new if len(states) <= len(blocks[number]) else number, symbol))
+
+        # Number the blocks in the order their states were reached, the initial state is always first
+        names = {}
+        for state in range(len(order)):
+            names.setdefault(block_of[state], str(len(names)))
+        new_delta = {}
+        for state in range(len(order)):
+            name = names[block_of[state]]
+            if name not in new_delta:
+                new_delta[name] = [(symbol, names[block_of[target]]) for symbol, target in zip(symbols, delta[state])]
+        new_f = sorted({names[block_of[state]] for state in final}, key=int)
+        return FiniteAutomaton(set(names.values()), self.sigma, new_delta, names[block_of[0]], new_f)
+
+    def lazy_dfa(self, max_states=LAZY_MAX_STATES):
+        """Method returning a lazily determinized view of the finite automaton, see `LazyDFA`."""
+        return LazyDFA(self, max_states)
+
     def to_dict(self):
         """Method for exporting the finite automaton to a dictionary format."""
         return {
@@ -123,3 +462,133 @@ class FiniteAutomaton:
                 dot.edge(src, dest, label=input_symbol)
 
         return dot
+
+    def write_dot(self, file, start=None, steps=None):
+        """Method for writing the DOT source of the finite automaton to a text file object in one pass.
+
+        Parallel transitions are merged into one edge labeled with `symbol_ranges` of their symbols, and lines are
+        written in batches instead of building a `Digraph`. Without `steps` every state is written, in sorted
+        order so the output is the same on every run. With `steps`, only the states reachable from `start`,
+        the initial state by default, in at most `steps` transitions are written, those whose transitions are
+        cut off being dashed. Returns the amount of states written.
+        """
+        start = self.q0 if start is None else start
+        if steps is None:
+            states = sorted(set(self.q) | set(self.delta) | {transition[-1] for transitions in self.delta.values() for transition in transitions}, key=str)
+            expanded = set(states)
+        else:
+            # Breadth-first search up to `steps` transitions away from `start`
+            depth = {start: 0}
+            frontier = [start]
+            for step in range(steps):
+                next_frontier = []
+                for state in frontier:
+                    for transition in self.delta.get(state, ()):
+                        if transition[-1] not in depth:
+                            depth[transition[-1]] = step + 1
+                            next_frontier.append(transition[-1])
+                frontier = next_frontier
+            states = sorted(depth, key=str)
+            expanded = {state for state in states if depth[state] < steps}
+        final = set(self.f)
+
+        lines = ["digraph {"]
+
+        def flush():
+            if len(lines) >= DOT_LINES_PER_WRITE:
+                file.write("\n".join(lines) + "\n")
+                lines.clear()
+
+        for state in states:
+            shape = "doublecircle" if state in final else "circle"
+            style = "" if state in expanded or not self.delta.get(state) else " style=dashed"
+            lines.append(f"\t{dot_quote(state)} [shape={shape}{style}]")
+            flush()
+        if self.q0 in states:
+            lines.append(f'\t{dot_quote(DOT_START_NODE)} [shape=none label=""]')
+            lines.append(f"\t{dot_quote(DOT_START_NODE)} -> {dot_quote(self.q0)}")
+        for state in states:
+            if state not in expanded:
+                continue
+            # Symbols of every target, in the order the targets first appear
+            targets = {}
+            for transition in self.delta.get(state, ()):
+                targets.setdefault(transition[-1], set()).add(transition[0])
+            for target, symbols in targets.items():
+                lines.append(f"\t{dot_quote(state)} -> {dot_quote(target)} [label={dot_quote(symbol_ranges(symbols))}]")
+                flush()
+        lines.append("}")
+        file.write("\n".join(lines) + "\n")
+        return len(states)
+
+
+class LazyDFA:
+    """Deterministic version of a finite automaton whose subset states are only built once an input reaches them.
+
+    The successors of a subset state are computed the first time a string reaches it, the same way `to_dfa`
+    computes them, and kept in an LRU cache of at most `max_states` subset states. When the cache is full
+    and most characters of a string still miss it, the cache is thrashing and the rest of that string is
+    run as a plain NFA simulation over bitsets instead. The empty subset is the dead state: once a string
+    reaches it, the string is rejected without reading the rest.
+    """
+    def __init__(self, automaton, max_states=LAZY_MAX_STATES):
+        states, symbols, self.moves, self.final = automaton._index_nfa()
+        self.codes = {symbol: column for column, symbol in enumerate(symbols)}
+        self.max_states = max(max_states, 1)
+        self.cache = OrderedDict()  # Subset bitset -> tuple of successor bitsets, one per symbol
+        self.start = 1 << 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __str__(self):
+        """Printable representation of the lazy DFA."""
+        return f"Lazy DFA: {len(self.cache)}/{self.max_states} states cached, misses={self.misses}, evictions={self.evictions}"
+
+    def successors(self, state_set):
+        """Method returning the successors of a subset state, computing and caching them on a miss."""
+        row = self.cache.get(state_set)
+        if row is not None:
+            self.cache.move_to_end(state_set)
+            return row
+        self.misses += 1
+        row = tuple(successor_sets(self.moves, state_set, len(self.codes)))
+        self.cache[state_set] = row
+        if len(self.cache) > self.max_states:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return row
+
+    def string_belong_to_language(self, inputString):
+        """Method for checking if a string belongs to the language of the finite automaton."""
+        codes, cache = self.codes, self.cache
+        state_set = self.start
+        misses = 0
+        for position, c in enumerate(inputString):
+            column = codes.get(c)
+            if column is None:
+                return False
+            row = cache.get(state_set)
+            if row is None:
+                row = self.successors(state_set)
+                misses += 1
+            else:
+                cache.move_to_end(state_set)
+            state_set = row[column]
+            if not state_set:
+                return False
+            if misses > LAZY_MIN_MISSES and 2 * misses > position and len(cache) >= self.max_states:
+                # The cache is thrashing, simulate the rest of the string without it
+                for c in inputString[position + 1:]:
+                    column = codes.get(c)
+                    if column is None:
+                        return False
+                    next_state_set, members = 0, state_set
+                    while members:
+                        lowest = members & -members
+                        next_state_set |= self.moves[lowest.bit_length() - 1].get(column, 0)
+                        members ^= lowest
+                    if not next_state_set:
+                        return False
+                    state_set = next_state_set
+                break
+        return state_set & self.final != 0
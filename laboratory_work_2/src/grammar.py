@@ -1,8 +1,15 @@
 import random
+import re
+from bisect import bisect_right
+from collections import Counter
 from enum import Enum
 from finite_automaton import FiniteAutomaton
 
 
+# Amount of derivations tried before giving up on finding a string within the length limit
+MAX_ATTEMPTS = 1000
+
+
 class GrammarTypology(str, Enum):
     """Enum class for the different types of grammars. 
     The values are the same as the ones used in the Chomsky hierarchy based on the LFPC Guide.
@@ -21,20 +28,147 @@ class Grammar:
         self.VT = VT
         self.P = P
         self.S = S
-        self.type = self.compute_type()  # Compute the grammar type during initialization
+        self._kinds = None  # Amount of productions of every kind, see `classify_production`
+        self.compile_productions()
+
+    @property
+    def type(self) -> str:
+        """The type of the grammar, classified once and then kept up to date by `add_production` and
+        `remove_production`.
+        """
+        if self._kinds is None:
+            self.compute_type()
+        return self._type_from_kinds()
 
     def __str__(self) -> str:
         """Printable representation of the grammar."""
         return f"{self.type} grammar: VN={self.VN}, VT={self.VT}, P={self.P}, S={self.S}"
 
-    def generate_string(self) -> str:
-        """Generates a random string from the grammar."""
-        string = self.S
-        while any(v in string for v in self.VN):
-            for v in string:
-                if v in self.VN:
-                    string = string.replace(v, random.choice(self.P[v]), 1)
-        return string
+    def compile_productions(self) -> None:
+        """Pre-tokenizes the productions into symbol ids, done once at construction.
+
+        Every nonterminal of VN gets an id below `len(VN)` and every run of terminal characters an id above,
+        so a production becomes a tuple of ids. Nonterminals are matched longest first, so names such as `S0`
+        are one symbol. Productions are stored reversed, ready to be pushed onto the derivation stack of
+        `generate_string`.
+        """
+        nonterminals = sorted(self.VN)
+        ids = {v: i for i, v in enumerate(nonterminals)}
+        self._symbols = list(nonterminals)
+        pattern = re.compile("(" + "|".join(map(re.escape, sorted(self.VN, key=len, reverse=True))) + ")")
+
+        def tokenize(production):
+            tokens = []
+            # Splitting on a capturing group alternates terminal runs (even) and nonterminals (odd)
+            for position, part in enumerate(pattern.split(production) if self.VN else [production]):
+                if position % 2:
+                    tokens.append(ids[part])
+                elif part:
+                    if part not in ids:
+                        ids[part] = len(self._symbols)
+                        self._symbols.append(part)
+                    tokens.append(ids[part])
+            return tuple(reversed(tokens))
+
+        self._productions = [[tokenize(production) for production in self.P.get(v, [])] for v in nonterminals]
+        self._start = tokenize(self.S)
+        self._compute_heights()
+
+    def _compute_heights(self) -> None:
+        """Computes the least derivation tree height of every nonterminal and production.
+
+        A production without nonterminals has height 1, otherwise 1 more than its highest nonterminal.
+        Nonterminals that never derive a terminal string keep an infinite height. The productions of every
+        nonterminal are also kept sorted by height, so the ones fitting under a depth limit are a prefix.
+        """
+        nonterminals = len(self.VN)
+        heights = [float("inf")] * nonterminals
+
+        def height(production):
+            return 1 + max((heights[symbol] for symbol in production if symbol < nonterminals), default=0)
+
+        changed = True
+        while changed:
+            changed = False
+            for v, productions in enumerate(self._productions):
+                least = min(map(height, productions), default=float("inf"))
+                if least < heights[v]:
+                    heights[v], changed = least, True
+        self._heights = heights
+        self._by_height = []
+        for productions in self._productions:
+            ordered = sorted(productions, key=height)
+            self._by_height.append(([height(production) for production in ordered], ordered))
+
+    def _derive(self, rng) -> str:
+        """Derives a string, always expanding the leftmost nonterminal with a production picked by `rng`."""
+        productions, symbols, nonterminals = self._productions, self._symbols, len(self.VN)
+        choice = rng.choice
+        stack = list(self._start)
+        string = []
+        while stack:
+            symbol = stack.pop()
+            if symbol < nonterminals:
+                stack.extend(choice(productions[symbol]))
+            else:
+                string.append(symbols[symbol])
+        return "".join(string)
+
+    def _derive_limited(self, rng, max_depth, max_length):
+        """Derives a string like `_derive`, without nesting nonterminals deeper than `max_depth`.
+
+        A nonterminal at depth d only picks among the productions of height at most `max_depth - d`, so a
+        derivation never has to be abandoned for its depth. Returns None once the string grows longer than
+        `max_length`.
+        """
+        by_height, symbols, nonterminals = self._by_height, self._symbols, len(self.VN)
+        randrange = rng.randrange
+        stack = [(symbol, 0) for symbol in self._start]
+        string, length = [], 0
+        while stack:
+            symbol, depth = stack.pop()
+            if symbol < nonterminals:
+                heights, productions = by_height[symbol]
+                production = productions[randrange(bisect_right(heights, max_depth - depth))]
+                stack.extend((child, depth + 1) for child in production)
+            else:
+                length += len(symbols[symbol])
+                if length > max_length:
+                    return None
+                string.append(symbols[symbol])
+        return "".join(string)
+
+    def _generate(self, rng, max_depth=None, max_length=None, attempts=MAX_ATTEMPTS) -> str:
+        """Generates a string with `rng`, retrying derivations that exceed `max_length`.
+        Raises ValueError when the limits can't be met.
+        """
+        if self._productions is None:
+            self.compile_productions()
+        if max_depth is None and max_length is None:
+            return self._derive(rng)
+        max_depth = float("inf") if max_depth is None else max_depth
+        max_length = float("inf") if max_length is None else max_length
+        if any(self._heights[symbol] > max_depth for symbol in self._start if symbol < len(self.VN)):
+            raise ValueError(f"No derivation of {self.S} fits within a depth of {max_depth}")
+        for _ in range(attempts):
+            string = self._derive_limited(rng, max_depth, max_length)
+            if string is not None:
+                return string
+        raise ValueError(f"No string of at most {max_length} characters found in {attempts} attempts")
+
+    def generate_string(self, max_depth=None, max_length=None) -> str:
+        """Generates a random string from the grammar.
+        Optionally limits the derivation tree depth and the string length, see `_generate`.
+        """
+        return self._generate(random, max_depth, max_length)
+
+    def generate_many(self, n, seed=None, max_depth=None, max_length=None):
+        """Generates `n` random strings from the grammar, one at a time.
+        The same seed always gives the same strings.
+        """
+        rng = random.Random(seed)
+        for _ in range(n):
+            yield self._generate(rng, max_depth, max_length)
 
     def to_finite_automaton(self) -> FiniteAutomaton:
         """Function to convert a grammar to a finite automaton."""
@@ -48,30 +182,40 @@ class Grammar:
         f = [item for item in values if len(set(self.P.keys())-set(item)) == len(set(self.P.keys()))]
         return FiniteAutomaton(q, sigma, delta, q0, f)
 
+    def classify_production(self, key, production) -> str:
+        """Classifies one production by the most general grammar type it needs.
+
+        Returns "unrestricted" for productions only allowed in recursively enumerable grammars, "context_sensitive"
+        for the ones whose left side isn't a single nonterminal, and otherwise "terminal", "right_linear",
+        "left_linear" or "context_free" depending on the right side.
+        """
+        if len(key) > len(production) or (len(key) > 1 and any(char in self.VN for char in key)):
+            return "unrestricted"
+        if len(key) != 1 or key not in self.VN:
+            return "context_sensitive"
+        if all(symbol in self.VT for symbol in production):
+            return "terminal"
+        if production[-1] in self.VN and all(symbol in self.VT for symbol in production[:-1]):
+            return "right_linear"
+        if production[0] in self.VN and all(symbol in self.VT for symbol in production[1:]):
+            return "left_linear"
+        return "context_free"
+
     def compute_type(self) -> str:
-        """Computes the type of the grammar and returns it as a string value from GrammarTypology enum."""
-        is_context_free, is_right_linear, is_left_linear, is_regular = True, False, False, True
-
-        for key, productions in self.P.items():
-            for production in productions:
-                # Checking for RECURSIVELY_ENUMERABLE_GRAMMAR conditions.
-                if len(key) > len(production) or (len(key) > 1 and any(char in self.VN for char in key)):
-                    return GrammarTypology.RECURSIVELY_ENUMERABLE_GRAMMAR.value
-
-                # Checking if not context-free or regular.
-                if len(key) != 1 or key not in self.VN:
-                    is_context_free, is_regular = False, False
-
-                # Further checks if it's still considered regular.
-                if is_regular:
-                    if all(symbol in self.VT for symbol in production):
-                        continue  # Still possibly right or left linear.
-                    elif production[-1] in self.VN and all(symbol in self.VT for symbol in production[:-1]):
-                        is_right_linear = True
-                    elif production[0] in self.VN and all(symbol in self.VT for symbol in production[1:]):
-                        is_left_linear = True
-                    else:
-                        is_regular = False
+        """Computes the type of the grammar and returns it as a string value from GrammarTypology enum.
+        Classifies every production again, use `type` for the cached classification.
+        """
+        self._kinds = Counter(self.classify_production(key, production) for key, productions in self.P.items() for production in productions)
+        return self._type_from_kinds()
+
+    def _type_from_kinds(self) -> str:
+        """Determines the grammar type from the amount of productions of every kind, in constant time."""
+        kinds = self._kinds
+        if kinds["unrestricted"]:
+            return GrammarTypology.RECURSIVELY_ENUMERABLE_GRAMMAR.value
+        is_context_free = kinds["context_sensitive"] == 0
+        is_regular = is_context_free and kinds["context_free"] == 0
+        is_right_linear, is_left_linear = kinds["right_linear"] > 0, kinds["left_linear"] > 0
 
         # Determining the specific grammar type based on flags.
         if is_regular:
@@ -81,9 +225,31 @@ class Grammar:
                 return GrammarTypology.LEFT_LINEAR_GRAMMAR.value
         if is_context_free:
             return GrammarTypology.CONTEXT_FREE_GRAMMAR.value
-        
+
         return GrammarTypology.CONTEXT_SENSITIVE_GRAMMAR.value
-    
+
+    def add_production(self, key, production) -> None:
+        """Adds a production, updating the cached type in constant time.
+        The precompiled productions are rebuilt by the next generated string.
+        """
+        self.P.setdefault(key, []).append(production)
+        if self._kinds is not None:
+            self._kinds[self.classify_production(key, production)] += 1
+        self._productions = None
+
+    def remove_production(self, key, production) -> None:
+        """Removes a production, updating the cached type in constant time.
+        Raises ValueError if the grammar doesn't have it.
+        """
+        if production not in self.P.get(key, []):
+            raise ValueError(f"The grammar has no production {key} -> {production}")
+        self.P[key].remove(production)
+        if not self.P[key]:
+            del self.P[key]
+        if self._kinds is not None:
+            self._kinds[self.classify_production(key, production)] -= 1
+        self._productions = None
+
     def to_dict(self) -> dict:
         """Method to export the Grammar to a dictionary format."""
         grammar_dict = {
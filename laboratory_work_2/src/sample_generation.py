@@ -0,0 +1,79 @@
+import gzip
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Default amount of strings generated by one task
+SHARD_SIZE = 10_000
+
+# The grammar of the current worker process, set once by `_initialize_worker`
+_grammar = None
+
+
+def _initialize_worker(grammar):
+    """Keep the grammar in the worker process, tasks only carry shard numbers."""
+    global _grammar
+    _grammar = grammar
+
+
+def shard_seed(seed, shard):
+    """The seed of one shard, derived from the seed of the whole run.
+    String seeds are hashed by `random.Random` the same way in every process.
+    """
+    return f"{seed}:{shard}"
+
+
+def generate_shard(grammar, seed, shard, size, max_depth=None, max_length=None):
+    """Generate the `size` strings of one shard."""
+    return list(grammar.generate_many(size, shard_seed(seed, shard), max_depth, max_length))
+
+
+def _generate_worker_shard(seed, shard, size, max_depth, max_length):
+    """Worker task: generate one shard with the grammar of the worker."""
+    return generate_shard(_grammar, seed, shard, size, max_depth, max_length)
+
+
+def generate_shards(grammar, n, seed=0, workers=None, shard_size=SHARD_SIZE, max_depth=None, max_length=None):
+    """Generate `n` strings from the grammar using a pool of processes.
+
+    The strings are split into shards of `shard_size`, every shard uses its own seed derived from `seed` and
+    its number, so the output only depends on `seed` and `shard_size`, never on the amount of workers.
+    Yields the list of strings of every shard in order while the following shards are still being generated.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = [(shard, min(shard_size, n - first)) for shard, first in enumerate(range(0, n, shard_size))]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(grammar,)) as executor:
+        # Keep a bounded amount of shards in flight, so strings are streamed instead of piling up
+        pending = deque()
+        for shard, size in shards:
+            pending.append(executor.submit(_generate_worker_shard, seed, shard, size, max_depth, max_length))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate_samples(grammar, n, seed=0, workers=None, shard_size=SHARD_SIZE, max_depth=None, max_length=None):
+    """Generate `n` strings from the grammar like `generate_shards`, yielding them one at a time."""
+    for strings in generate_shards(grammar, n, seed, workers, shard_size, max_depth, max_length):
+        yield from strings
+
+
+def write_samples(grammar, path, n, seed=0, workers=None, shard_size=SHARD_SIZE, max_depth=None, max_length=None):
+    """Write `n` strings generated by `generate_shards` to a file, one per line.
+
+    Paths ending in `.gz` are gzip compressed, with an empty name and timestamp in the header so the file
+    is byte-identical between runs. Returns the amount of strings written.
+    """
+    with open(path, "wb") as raw:
+        file = gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) if path.endswith(".gz") else raw
+        try:
+            written = 0
+            for strings in generate_shards(grammar, n, seed, workers, shard_size, max_depth, max_length):
+                file.write("".join(string + "\n" for string in strings).encode("utf-8"))
+                written += len(strings)
+        finally:
+            if file is not raw:
+                file.close()
+    return written
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from corpus_validation import split_ranges, validate_corpus
+from finite_automaton import FiniteAutomaton
+
+
+class TestCorpusValidation(unittest.TestCase):
+    def setUp(self):
+        self.finite_automaton = FiniteAutomaton(
+            q={"S", "Q", "P"},
+            sigma={"e", "a", "b", "d", "f", "c"},
+            delta={
+                "S": [("a", "P"), ("b", "Q")],
+                "P": [("b", "P"), ("c", "P"), ("d", "Q"), ("e",)],
+                "Q": [("e", "Q"), ("f", "Q"), ("a",)]
+            },
+            q0="S",
+            f=["e", "a"],
+        )
+        self.lines = ["ab", "bdfa", "", "ae", "adea", "aex", "abbbbbbbbbbbbbbda", "bce", "ae"]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "corpus.txt")
+        with open(self.path, "w") as file:
+            file.write("\n".join(self.lines))
+
+    def test_split_ranges(self):
+        """Test that the byte ranges cover the whole file and end on line boundaries."""
+        ranges = split_ranges(self.path, chunk_size=7)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b"\n")
+        self.assertEqual(split_ranges(self.path, chunk_size=1 << 20), [(0, len(data))])
+
+    def test_validate_corpus(self):
+        """Test that the accepted lines and their offsets match checking every line on its own."""
+        results = list(validate_corpus(self.finite_automaton, self.path, workers=2, chunk_size=7))
+        offsets, expected_offsets, position = [], [], 0
+        for line in self.lines:
+            if self.finite_automaton.string_belong_to_language(line):
+                expected_offsets.append(position)
+            position += len(line) + 1
+        for result in results:
+            offsets.extend(result["offsets"].tolist())
+        self.assertEqual(sum(result["lines"] for result in results), len(self.lines))
+        self.assertEqual(sum(result["accepted"] for result in results), len(expected_offsets))
+        self.assertEqual(offsets, expected_offsets)
+
+
+if __name__ == "__main__":
+    unittest.main()
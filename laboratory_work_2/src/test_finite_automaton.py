@@ -1,6 +1,9 @@
+import io
+import itertools
 import os
+import random
 import unittest
-from finite_automaton import FiniteAutomaton
+from finite_automaton import FiniteAutomaton, SPECULATIVE_MIN_LENGTH, symbol_ranges
 from grammar import Grammar
 
 
@@ -181,6 +184,386 @@ class TestToDfa(unittest.TestCase):
         )
         self.assertEqual(test_finite_automaton.to_dfa().to_dict(), expcted_finite_automaton.to_dict())
 
+    def test_to_dfa_with_terminal_transitions(self):
+        """Test of conversion to deterministic finite automaton with transitions that end in a terminal."""
+        test_finite_automaton = FiniteAutomaton(
+            q={"S", "P"},
+            sigma={"a", "b"},
+            delta={
+                "S": [("a", "S"), ("a", "P")],
+                "P": [("b",)],
+            },
+            q0="S",
+            f=["b"],
+        )
+        dfa = test_finite_automaton.to_dfa()
+        self.assertEqual(dfa.q, {"S", "1", "2"})
+        self.assertEqual(dfa.delta, {"S": [("a", "1")], "1": [("a", "1"), ("b", "2")]})
+        self.assertEqual(dfa.q0, "S")
+        self.assertEqual(dfa.f, ["2"])
+        self.assertTrue(test_finite_automaton.string_belong_to_language("aab"))
+
+
+class TestStringBelongToLanguage(unittest.TestCase):
+    def test_string_belong_to_language_based_on_first_lab(self):
+        """Test of string membership based on the first lab's example."""
+        q={"S", "Q", "P"}
+        sigma={"e", "a", "b", "d", "f", "c"}
+        delta={
+            "S": [("a", "P"), ("b", "Q")],
+            "P": [("b", "P"), ("c", "P"), ("d", "Q"), ("e",)],
+            "Q": [("e", "Q"), ("f", "Q"), ("a",)]
+        }
+        q0="S"
+        f=["e", "a"]
+        test_finite_automaton = FiniteAutomaton(
+            q=q,
+            sigma=sigma,
+            delta=delta,
+            q0=q0,
+            f=f,
+        )
+        self.assertFalse(test_finite_automaton.string_belong_to_language("ab"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("bce"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("aex"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("bdfa"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("aeb"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("aeeeee"))
+        self.assertTrue(test_finite_automaton.string_belong_to_language("bfea"))
+        self.assertTrue(test_finite_automaton.string_belong_to_language("ae"))
+        self.assertTrue(test_finite_automaton.string_belong_to_language("adea"))
+        self.assertTrue(test_finite_automaton.string_belong_to_language("abbbbbbbbbbbbbbda"))
+
+    def test_string_belong_to_language_based_on_second_lab(self):
+        """Test of string membership of a non-deterministic automaton based on the second lab's example."""
+        q = {"0", "1", "2", "3"}
+        sigma = {"a", "c", "b"}
+        delta = {
+            "0": [("a", "0"), ("a", "1")],
+            "1": [("c", "1"), ("b", "2")],
+            "2": [("b", "3")],
+            "3": [("a", "1")]
+        }
+        q0 = "0"
+        f = ["2"]
+        test_finite_automaton = FiniteAutomaton(
+            q=q,
+            sigma=sigma,
+            delta=delta,
+            q0=q0,
+            f=f,
+        )
+        self.assertTrue(test_finite_automaton.string_belong_to_language("aab"))
+        self.assertTrue(test_finite_automaton.string_belong_to_language("acccbbab"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language(""))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("aabb"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("cab"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("bab"))
+
+    def test_string_belong_to_language_multi_character_symbols(self):
+        """Test of an alphabet with symbols longer than one character, read from sequences of symbols."""
+        test_finite_automaton = FiniteAutomaton(
+            q={"0", "1"},
+            sigma={"ab", "c"},
+            delta={"0": [("ab", "1")], "1": [("c", "0")]},
+            q0="0",
+            f=["1"],
+        )
+        self.assertTrue(test_finite_automaton.string_belong_to_language(["ab"]))
+        self.assertTrue(test_finite_automaton.string_belong_to_language(["ab", "c", "ab"]))
+        self.assertFalse(test_finite_automaton.string_belong_to_language(["ab", "c"]))
+        self.assertFalse(test_finite_automaton.string_belong_to_language(["c"]))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("ab"))
+        self.assertEqual(test_finite_automaton.accepts_many([["ab"], ["ab", "c"], ["ab", "ab"], "ab"]).tolist(), [True, False, False, False])
+
+    def test_string_belong_to_language_long_input(self):
+        """Test that long strings, checked chunk-wise, give the same result as the character loop."""
+        test_finite_automaton = FiniteAutomaton(
+            q={"S", "Q", "P"},
+            sigma={"e", "a", "b", "d", "f", "c"},
+            delta={
+                "S": [("a", "P"), ("b", "Q")],
+                "P": [("b", "P"), ("c", "P"), ("d", "Q"), ("e",)],
+                "Q": [("e", "Q"), ("f", "Q"), ("a",)]
+            },
+            q0="S",
+            f=["e", "a"],
+        ).compile()
+        body = "bcb" * 40_000
+        self.assertGreaterEqual(len(body), SPECULATIVE_MIN_LENGTH)
+        self.assertTrue(test_finite_automaton.string_belong_to_language("a" + body + "dea"))
+        self.assertTrue(test_finite_automaton.string_belong_to_language("a" + body + "e"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("a" + body + "de"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("a" + body + "d"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("a" + body + "ea"))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("b" + body))
+        self.assertFalse(test_finite_automaton.string_belong_to_language("a" + body + "x" + "dea"))
+
+
+class TestAcceptsMany(unittest.TestCase):
+    def test_accepts_many_based_on_first_lab(self):
+        """Test of batched membership based on the first lab's example."""
+        q={"S", "Q", "P"}
+        sigma={"e", "a", "b", "d", "f", "c"}
+        delta={
+            "S": [("a", "P"), ("b", "Q")],
+            "P": [("b", "P"), ("c", "P"), ("d", "Q"), ("e",)],
+            "Q": [("e", "Q"), ("f", "Q"), ("a",)]
+        }
+        q0="S"
+        f=["e", "a"]
+        test_finite_automaton = FiniteAutomaton(
+            q=q,
+            sigma=sigma,
+            delta=delta,
+            q0=q0,
+            f=f,
+        )
+        strings = ["ab", "bce", "bdfa", "ae", "", "adea", "aex", "abbbbbbbbbbbbbbda", "a" + "bc" * 100 + "e", "aeb", "aeeeee", "bfea"]
+        self.assertEqual(
+            test_finite_automaton.accepts_many(strings, batch_size=4).tolist(),
+            [False, False, False, True, False, True, False, True, True, False, False, True],
+        )
+        self.assertEqual(
+            test_finite_automaton.accepts_many(strings, batch_size=4).tolist(),
+            [test_finite_automaton.string_belong_to_language(string) for string in strings],
+        )
+        self.assertEqual(test_finite_automaton.accepts_many([]).tolist(), [])
+
+    def test_accepts_many_based_on_second_lab(self):
+        """Test of batched membership of a non-deterministic automaton based on the second lab's example."""
+        q = {"0", "1", "2", "3"}
+        sigma = {"a", "c", "b"}
+        delta = {
+            "0": [("a", "0"), ("a", "1")],
+            "1": [("c", "1"), ("b", "2")],
+            "2": [("b", "3")],
+            "3": [("a", "1")]
+        }
+        q0 = "0"
+        f = ["2"]
+        test_finite_automaton = FiniteAutomaton(
+            q=q,
+            sigma=sigma,
+            delta=delta,
+            q0=q0,
+            f=f,
+        )
+        strings = ["aab", "acccbbab", "", "aabb", "ab", "ba", "cab", "bab", "acab"]
+        self.assertEqual(test_finite_automaton.accepts_many(strings).tolist(), [True, True, False, False, True, False, False, False, False])
+
+
+class TestMinimize(unittest.TestCase):
+    @staticmethod
+    def nfa_accepts(automaton, inputString):
+        """Reference membership by simulating the set of current states of `delta`, a missing transition
+        leaving no state. A transition `(symbol,)` leads to the state named by the symbol.
+        """
+        states = {automaton.q0}
+        for c in inputString:
+            states = {transition[-1] for state in states for transition in automaton.delta.get(state, []) if transition[0] == c}
+        return bool(states & set(automaton.f))
+
+    def assertSameLanguage(self, automaton, minimized, max_length=5):
+        """Check that the minimized automaton accepts the same strings over sigma as the simulation of the
+        original one, for every string up to `max_length` characters.
+        """
+        for length in range(max_length + 1):
+            for symbols in itertools.product(sorted(automaton.sigma), repeat=length):
+                inputString = "".join(symbols)
+                self.assertEqual(minimized.string_belong_to_language(inputString), self.nfa_accepts(automaton, inputString), inputString)
+
+    def test_minimize_based_on_first_lab(self):
+        """Test of minimization based on the first lab's example, the two terminal states are merged."""
+        q={"S", "Q", "P"}
+        sigma={"e", "a", "b", "d", "f", "c"}
+        delta={
+            "S": [("a", "P"), ("b", "Q")],
+            "P": [("b", "P"), ("c", "P"), ("d", "Q"), ("e",)],
+            "Q": [("e", "Q"), ("f", "Q"), ("a",)]
+        }
+        q0="S"
+        f=["e", "a"]
+        test_finite_automaton = FiniteAutomaton(
+            q=q,
+            sigma=sigma,
+            delta=delta,
+            q0=q0,
+            f=f,
+        )
+        minimized = test_finite_automaton.minimize()
+        # S, P, Q, the merged terminal states and the dead state
+        self.assertEqual(minimized.q, {"0", "1", "2", "3", "4"})
+        self.assertEqual(minimized.q0, "0")
+        self.assertEqual(minimized.f, ["4"])
+        self.assertTrue(minimized.is_deterministic())
+        self.assertSameLanguage(test_finite_automaton, minimized)
+
+    def test_minimize_based_on_second_lab(self):
+        """Test of minimization of a non-deterministic automaton based on the second lab's example."""
+        q = {"0", "1", "2", "3"}
+        sigma = {"a", "c", "b"}
+        delta = {
+            "0": [("a", "0"), ("a", "1")],
+            "1": [("c", "1"), ("b", "2")],
+            "2": [("b", "3")],
+            "3": [("a", "1")]
+        }
+        q0 = "0"
+        f = ["2"]
+        test_finite_automaton = FiniteAutomaton(
+            q=q,
+            sigma=sigma,
+            delta=delta,
+            q0=q0,
+            f=f,
+        )
+        minimized = test_finite_automaton.minimize()
+        # The subsets {0}, {0, 1}, {1}, {2}, {3} and the dead state are all distinguishable
+        self.assertEqual(len(minimized.q), 6)
+        self.assertEqual(len(minimized.minimize().q), 6)
+        self.assertSameLanguage(test_finite_automaton, minimized, max_length=7)
+        self.assertFalse(minimized.string_belong_to_language("cab"))
+        self.assertFalse(minimized.string_belong_to_language("bab"))
+
+
+class TestLazyDFA(unittest.TestCase):
+    def test_lazy_dfa_based_on_second_lab(self):
+        """Test of lazy determinization with a tiny cache based on the second lab's example."""
+        q = {"0", "1", "2", "3"}
+        sigma = {"a", "c", "b"}
+        delta = {
+            "0": [("a", "0"), ("a", "1")],
+            "1": [("c", "1"), ("b", "2")],
+            "2": [("b", "3")],
+            "3": [("a", "1")]
+        }
+        q0 = "0"
+        f = ["2"]
+        test_finite_automaton = FiniteAutomaton(
+            q=q,
+            sigma=sigma,
+            delta=delta,
+            q0=q0,
+            f=f,
+        )
+        lazy_dfa = test_finite_automaton.lazy_dfa(max_states=2)
+        for length in range(7):
+            for symbols in itertools.product(sorted(sigma), repeat=length):
+                inputString = "".join(symbols)
+                self.assertEqual(lazy_dfa.string_belong_to_language(inputString), test_finite_automaton.string_belong_to_language(inputString))
+                self.assertLessEqual(len(lazy_dfa.cache), 2)
+        self.assertFalse(lazy_dfa.string_belong_to_language("aax"))
+        self.assertFalse(lazy_dfa.string_belong_to_language("cab"))
+        self.assertFalse(lazy_dfa.string_belong_to_language("bab"))
+        self.assertGreater(lazy_dfa.evictions, 0)
+
+    def test_lazy_dfa_dead_state(self):
+        """Test that a string is rejected as soon as it reaches the empty subset, without reading the rest."""
+        test_finite_automaton = FiniteAutomaton(
+            q={"0", "1", "2", "3"},
+            sigma={"a", "c", "b"},
+            delta={
+                "0": [("a", "0"), ("a", "1")],
+                "1": [("c", "1"), ("b", "2")],
+                "2": [("b", "3")],
+                "3": [("a", "1")]
+            },
+            q0="0",
+            f=["2"],
+        )
+        lazy_dfa = test_finite_automaton.lazy_dfa()
+        self.assertFalse(lazy_dfa.string_belong_to_language("b" + "acb" * 1000))
+        # Only the initial subset has been expanded
+        self.assertEqual(lazy_dfa.misses, 1)
+        self.assertEqual(len(lazy_dfa.cache), 1)
+
+    def test_lazy_dfa_fall_back_to_nfa_simulation(self):
+        """Test that strings still get the right answer once the cache is thrashing."""
+        # Strings whose 12th symbol from the end is an "a", the deterministic version has 4096 states
+        delta = {"0": [("a", "0"), ("b", "0"), ("a", "1")]}
+        for state in range(1, 12):
+            delta[str(state)] = [("a", str(state + 1)), ("b", str(state + 1))]
+        test_finite_automaton = FiniteAutomaton(
+            q={str(state) for state in range(13)},
+            sigma={"a", "b"},
+            delta=delta,
+            q0="0",
+            f=["12"],
+        )
+        lazy_dfa = test_finite_automaton.lazy_dfa(max_states=16)
+        rng = random.Random(0)
+        inputString = "".join(rng.choice("ab") for _ in range(600)) + "a" + "b" * 11
+        self.assertTrue(lazy_dfa.string_belong_to_language(inputString))
+        self.assertFalse(lazy_dfa.string_belong_to_language(inputString + "b"))
+        self.assertEqual(len(lazy_dfa.cache), 16)
+        # Only the characters read before the fallback can have missed the cache
+        self.assertLess(lazy_dfa.misses, 100)
+
+
+class TestWriteDot(unittest.TestCase):
+    def setUp(self):
+        self.automaton = FiniteAutomaton(
+            q={"0", "1", "2", "3"},
+            sigma={"a", "b", "c"},
+            delta={
+                "0": [("a", "0"), ("a", "1"), ("b", "1"), ("c", "1")],
+                "1": [("c", "1"), ("b", "2")],
+                "2": [("b", "3")],
+                "3": [("a", "1")]
+            },
+            q0="0",
+            f=["2"],
+        )
+
+    def test_symbol_ranges(self):
+        """Test of writing sets of symbols with ranges."""
+        self.assertEqual(symbol_ranges(set("abcdxz")), "a-d,x,z")
+        self.assertEqual(symbol_ranges(set("ab")), "a,b")
+        self.assertEqual(symbol_ranges({"0", "1", "2", "10"}), "0-2,10")
+
+    def test_write_dot(self):
+        """Test of the DOT source with parallel transitions merged."""
+        file = io.StringIO()
+        self.assertEqual(self.automaton.write_dot(file), 4)
+        self.assertEqual(file.getvalue(), "digraph {\n"
+                                          "\t\"0\" [shape=circle]\n"
+                                          "\t\"1\" [shape=circle]\n"
+                                          "\t\"2\" [shape=doublecircle]\n"
+                                          "\t\"3\" [shape=circle]\n"
+                                          "\t\"__start__\" [shape=none label=\"\"]\n"
+                                          "\t\"__start__\" -> \"0\"\n"
+                                          "\t\"0\" -> \"0\" [label=\"a\"]\n"
+                                          "\t\"0\" -> \"1\" [label=\"a-c\"]\n"
+                                          "\t\"1\" -> \"1\" [label=\"c\"]\n"
+                                          "\t\"1\" -> \"2\" [label=\"b\"]\n"
+                                          "\t\"2\" -> \"3\" [label=\"b\"]\n"
+                                          "\t\"3\" -> \"1\" [label=\"a\"]\n"
+                                          "}\n")
+
+    def test_state_named_empty_string(self):
+        """Test that a state named "" is not mistaken for the start marker."""
+        file = io.StringIO()
+        FiniteAutomaton(q={"", "0"}, sigma={"a"}, delta={"0": [("a", "")]}, q0="0", f=[""]).write_dot(file)
+        dot = file.getvalue()
+        self.assertIn("\t\"\" [shape=doublecircle]\n", dot)
+        self.assertIn("\t\"__start__\" -> \"0\"\n", dot)
+        self.assertIn("\t\"0\" -> \"\" [label=\"a\"]\n", dot)
+
+    def test_neighborhood(self):
+        """Test of writing only the states a few steps away from a state."""
+        file = io.StringIO()
+        self.assertEqual(self.automaton.write_dot(file, start="1", steps=1), 2)
+        dot = file.getvalue()
+        self.assertIn("\"2\" [shape=doublecircle style=dashed]", dot)
+        self.assertIn("\"1\" -> \"2\"", dot)
+        self.assertNotIn("\"3\"", dot)
+        self.assertNotIn("\"__start__\"", dot)
+        file = io.StringIO()
+        self.assertEqual(self.automaton.write_dot(file, steps=0), 1)
+        self.assertEqual(file.getvalue().count("->"), 1)
+        self.assertIn("\"0\" [shape=circle style=dashed]", file.getvalue())
+
 
 class TestVisualize(unittest.TestCase):
     def test_visualize_based_on_first_lab(self):
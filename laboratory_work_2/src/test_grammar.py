@@ -44,6 +44,57 @@ class TestGrammar(unittest.TestCase):
         )
         self.assertEqual(grammar.type, GrammarTypology.LEFT_LINEAR_GRAMMAR.value)
 
+    def test_add_and_remove_production(self):
+        """Test that the cached type follows edits and matches a full classification after every one."""
+        grammar = Grammar(
+            VN={"S", "P", "Q"},
+            VT={"a", "b", "c", "d", "e", "f"},
+            P={"S": ["aP", "bQ"], "P": ["bP", "cP", "dQ", "e"], "Q": ["eQ", "fQ", "a"]},
+        )
+        edits = [
+            ("add", "Q", "Pa", GrammarTypology.CONTEXT_FREE_GRAMMAR),
+            ("remove", "Q", "Pa", GrammarTypology.RIGHT_LINEAR_GRAMMAR),
+            ("add", "S", "aSb", GrammarTypology.CONTEXT_FREE_GRAMMAR),
+            ("add", "SP", "Sa", GrammarTypology.RECURSIVELY_ENUMERABLE_GRAMMAR),
+            ("remove", "SP", "Sa", GrammarTypology.CONTEXT_FREE_GRAMMAR),
+            ("remove", "S", "aSb", GrammarTypology.RIGHT_LINEAR_GRAMMAR),
+        ]
+        for action, key, production, expected in edits:
+            if action == "add":
+                grammar.add_production(key, production)
+            else:
+                grammar.remove_production(key, production)
+            self.assertEqual(grammar.type, expected.value)
+            self.assertEqual(grammar.compute_type(), expected.value)
+        self.assertNotIn("SP", grammar.P)
+        with self.assertRaises(ValueError):
+            grammar.remove_production("S", "aSb")
+
+        grammar.add_production("P", "f")
+        self.assertIn("af", list(grammar.generate_many(500, seed=0)))
+
+
+class TestGenerateString(unittest.TestCase):
+    """Test of the string generation based on the first lab's grammar."""
+    def setUp(self):
+        self.grammar = Grammar(
+            VN={"S", "P", "Q"},
+            VT={"a", "b", "c", "d", "e", "f"},
+            P={"S": ["aP", "bQ"], "P": ["bP", "cP", "dQ", "e"], "Q": ["eQ", "fQ", "a"]},
+        )
+
+    def test_generate_string(self):
+        finite_automaton = self.grammar.to_finite_automaton()
+        for _ in range(100):
+            self.assertTrue(finite_automaton.string_belong_to_language(self.grammar.generate_string()))
+
+    def test_generate_many(self):
+        finite_automaton = self.grammar.to_finite_automaton()
+        strings = list(self.grammar.generate_many(500, seed=42))
+        self.assertEqual(len(strings), 500)
+        self.assertEqual(strings, list(self.grammar.generate_many(500, seed=42)))
+        self.assertTrue(all(finite_automaton.accepts_many(strings)))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import gzip
+import os
+import tempfile
+import unittest
+from grammar import Grammar
+from sample_generation import generate_samples, generate_shard, write_samples
+
+
+class TestSampleGeneration(unittest.TestCase):
+    def setUp(self):
+        self.grammar = Grammar(
+            VN={"S", "P", "Q"},
+            VT={"a", "b", "c", "d", "e", "f"},
+            P={"S": ["aP", "bQ"], "P": ["bP", "cP", "dQ", "e"], "Q": ["eQ", "fQ", "a"]},
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_generate_samples(self):
+        """Test that the strings only depend on the seed and the shard size, not on the amount of workers."""
+        samples = list(generate_samples(self.grammar, 250, seed=3, workers=1, shard_size=40))
+        self.assertEqual(len(samples), 250)
+        self.assertEqual(samples, list(generate_samples(self.grammar, 250, seed=3, workers=3, shard_size=40)))
+        self.assertEqual(samples[40:80], generate_shard(self.grammar, 3, 1, 40))
+        self.assertTrue(all(self.grammar.to_finite_automaton().accepts_many(samples)))
+
+    def test_write_samples(self):
+        """Test that compressed files are byte-identical for any amount of workers."""
+        paths = [os.path.join(self.directory, f"samples_{workers}.txt.gz") for workers in (1, 2)]
+        for workers, path in zip((1, 2), paths):
+            self.assertEqual(write_samples(self.grammar, path, 100, seed=5, workers=workers, shard_size=30), 100)
+        with open(paths[0], "rb") as first, open(paths[1], "rb") as second:
+            self.assertEqual(first.read(), second.read())
+        with gzip.open(paths[0], "rt") as file:
+            self.assertEqual(file.read().splitlines(), list(generate_samples(self.grammar, 100, seed=5, workers=1, shard_size=30)))
+
+    def test_limits(self):
+        """Test the depth and length limits on a recursive grammar in Chomsky normal form."""
+        grammar = Grammar(
+            VN={"S0", "S", "A", "B"},
+            VT={"a", "b"},
+            P={"S0": ["AB", "SS"], "S": ["AB", "SS"], "A": ["a"], "B": ["b", "SB"]},
+            S="S0",
+        )
+        for string in grammar.generate_many(200, seed=1, max_depth=6):
+            self.assertTrue(set(string) <= {"a", "b"})
+            self.assertLessEqual(len(string), 2 ** 5)
+        for string in grammar.generate_many(200, seed=1, max_length=10):
+            self.assertLessEqual(len(string), 10)
+        with self.assertRaises(ValueError):
+            grammar.generate_string(max_depth=1)
+        with self.assertRaises(ValueError):
+            grammar.generate_string(max_length=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+import contextlib
+import io
+import random
+import string
+import time
+from collections import defaultdict
+from cyk_parser import CYKParser
+from grammar import Grammar, split_production
+
+
+def lab_5_grammar():
+    """The lab's example grammar, normalized to Chomsky Normal Form."""
+    grammar = Grammar(
+        VN={"S", "A", "B", "C", "D", "E"},
+        VT={"a", "b"},
+        P={
+            "S": ["aB", "AC"],
+            "A": ["a", "ASC", "BC", "aD"],
+            "B": ["b", "bS"],
+            "C": ["", "BA"],
+            "E": ["aB"],
+            "D": ["abC"]
+        },
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        grammar.normalize_to_chomsky_normal_form()
+    return grammar
+
+
+class OriginalGrammar:
+    """The original normalization steps, rescanning and mutating the productions as strings."""
+    def __init__(self, VN, VT, P, S="S"):
+        self.VN = VN
+        self.VT = VT
+        self.P = P
+        self.S = S
+
+    def start_symbol_check(self):
+        """Method to check if the start symbol occurs on some right side of the productions.
+        If it does, a new start symbol is created.
+        """
+        if self.S in "".join([element for value_list in self.P.values() for element in value_list]):
+            new_start = f"{self.S}'"
+            self.VN.add(new_start)
+            self.P[new_start] = [self.S]
+            self.S = new_start
+
+    def replace_all_combinations(self, value, node):
+        """Method that given a possible value and a node, removes the node from the value in all possibl combinations
+        and returns the new values.
+        """
+        if node not in value:
+            # If the node is not in the value, return the original value in a list
+            return [value]
+        
+        results = set()  # Using a set to avoid duplicate entries
+
+        # Recursive function to generate combinations by removing the node
+        def generate_combinations(current, start):
+            # Loop through the string and try removing the node at each position
+            for i in range(start, len(current)):
+                if current.startswith(node, i):
+                    # Remove the node and recursively call with the new string
+                    new_combination = current[:i] + current[i + len(node):]
+                    if new_combination not in results:
+                        results.add(new_combination)
+                        generate_combinations(new_combination, i)
+
+        # Start generating combinations from the initial value
+        generate_combinations(value, 0)
+
+        # Convert the set to a list and ensure the original value is removed
+        result_list = list(results)
+
+        if value in result_list:
+            result_list.remove(value)
+
+        return result_list
+
+    def remove_null_productions(self):
+        """Method to eliminate ε productions from the grammar."""
+        nullable = {v for v in self.VN if "" in self.P[v]}
+        
+        for node_with_empty in nullable:
+            for v in self.VN:
+                for production in self.P[v]:
+                    if node_with_empty in production:
+                        if production == node_with_empty:
+                            nullable.add(v)
+                        else:
+                            new_productions = self.replace_all_combinations(production, node_with_empty)
+                            self.P[v].extend(new_productions)
+            self.P[node_with_empty] = [production for production in self.P[node_with_empty] if production != ""]
+
+    def compute_unit_productions(self):
+        """Method to compute unit productions."""
+        unit_productions = {v for v in self.VN if any(len(p) == 1 and p in self.VN for p in self.P[v])}
+        return unit_productions
+
+    def remove_unit_productions(self):
+        """Method to remove unit productions from the grammar."""
+        while self.compute_unit_productions():
+            # replace the unit productions identified to the right side of the productions
+            unit_productions = self.compute_unit_productions()
+            for key in unit_productions:
+                for production in self.P[key]:
+                    if len(production) == 1 and production in self.VN:
+                        self.P[key].remove(production)
+                        self.P[key].extend(self.P[production])
+
+    def remove_two_or_more_symbols(self):
+        """Method to remove productions with more than 2 symbols."""
+        # extract violating productions
+        violating_productions = {v: [p for p in self.P[v] if len(p) > 2] for v in self.P}
+        new_productions = defaultdict(list)
+        for v in violating_productions:
+            for production in violating_productions[v]:
+                last_two = production[-2:]
+                if last_two not in new_productions:
+                    new_state = f"{v}*"
+                    self.VN.add(new_state)
+                    new_productions[last_two].append(new_state)
+                    self.P[new_state] = [last_two]
+        # replace the violating productions with the new productions
+        for production in new_productions:
+            for v in self.P:
+                for p in self.P[v]:
+                    if (p[-2:] == production) and (len(p) > 2):
+                        self.P[v].remove(p)
+                        p = p[:-2] + new_productions[production][0]
+                        self.P[v].append(p)
+
+    def remove_terminal_and_variable_productions(self):
+        """Method to remove terminal and variable productions."""
+        # fina all terminal symbols to be replaced
+        states_to_iterate = [key for key in self.P.keys()]
+        for v in states_to_iterate:
+            for i, production in enumerate(self.P[v]):
+                if (len(production) > 1) and (production.upper() != production) and (production.lower() != production):
+                    for symbol in production:
+                        if symbol in self.VT:
+                            new_state = f"{symbol}*"
+                            if new_state not in self.VN:
+                                self.VN.add(new_state)
+                                self.P[new_state] = [symbol]
+                            self.P[v][i] = production.replace(symbol, new_state)
+
+
+def random_grammar(rng, nonterminals, productions, names=None, null_rate=0.01):
+    """A random grammar with about `productions` productions of up to 4 symbols over `nonterminals` nonterminals.
+    A few productions are ε or unit productions, so every normalization step has work to do. Only the last
+    quarter of the nonterminals has ε productions and unit productions only lead to later nonterminals before
+    that quarter, since the original steps loop forever on unit cycles.
+    """
+    names = names or [f"N{i}" for i in range(nonterminals)]
+    VT = set(string.ascii_lowercase[:8])
+    P = {v: [] for v in names}
+    quarter = len(names) * 3 // 4
+    for _ in range(productions):
+        i = rng.randrange(len(names))
+        v = names[i]
+        kind = rng.random()
+        if kind < null_rate and i >= quarter:
+            body = ""
+        elif kind < 0.05 and i + 1 < quarter:
+            body = names[rng.randrange(i + 1, quarter)]
+        elif kind < 0.15:
+            body = rng.choice(sorted(VT))
+        else:
+            body = "".join(rng.choice(names) if rng.random() < 0.6 else rng.choice(sorted(VT)) for _ in range(rng.randint(2, 4)))
+        if body not in P[v]:
+            P[v].append(body)
+    return Grammar(set(names), VT, P, names[0])
+
+
+def one_head_grammar(rng, productions):
+    """A grammar whose start symbol has `productions` distinct bodies of 6 to 10 symbols, the other nonterminals
+    only deriving terminals, so binarization has many long bodies to rewrite on one head.
+    """
+    VN, VT = {"S", "A", "B", "C"}, {"a", "b"}
+    bodies = set()
+    while len(bodies) < productions:
+        bodies.add("".join(rng.choice("ABCab") for _ in range(rng.randint(6, 10))))
+    P = {"S": sorted(bodies), "A": ["a"], "B": ["b"], "C": ["a", "b"]}
+    return Grammar(VN, VT, P)
+
+
+def normalize(grammar):
+    """Run the normalization steps of `normalize_to_chomsky_normal_form` without printing."""
+    grammar.start_symbol_check()
+    grammar.remove_null_productions()
+    grammar.remove_unit_productions()
+    grammar.remove_two_or_more_symbols()
+    grammar.remove_terminal_and_variable_productions()
+    return grammar
+
+
+def naive_cyk(grammar, string):
+    """CYK with a set per cell and a triple loop over lengths, starts and splits, trying every rule on every split."""
+    rules = [(v, split_production(production, grammar.VN)) for v, productions in grammar.P.items() for production in productions]
+    binary = [(v, body[0], body[1]) for v, body in rules if len(body) == 2]
+    n = len(string)
+    table = {(i, i + 1): {v for v, body in rules if body == [c]} | {c} for i, c in enumerate(string)}
+    for length in range(2, n + 1):
+        for i in range(n - length + 1):
+            cell = set()
+            for k in range(i + 1, i + length):
+                for v, left, right in binary:
+                    if left in table[(i, k)] and right in table[(k, i + length)]:
+                        cell.add(v)
+            table[(i, i + length)] = cell
+    return grammar.S in table[(0, n)]
+
+
+def timed(function, *args, repeat=1):
+    """Run the function `repeat` times and return its result together with the best elapsed time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def benchmark_cyk(lengths=(100, 250, 500, 1000, 2000), naive_lengths=(100, 250)):
+    """Compare the bitset and NumPy charts with the naive triple loop on random strings."""
+    grammar = lab_5_grammar()
+    parser = CYKParser(grammar)
+    rng = random.Random(0)
+    print(f"CYK on random strings, {len(parser.pairs)} binary rule bodies")
+    for n in lengths:
+        string = "".join(rng.choice("ab") for _ in range(n))
+        bitset_result, bitset_time = timed(parser.recognize, string)
+        numpy_result, numpy_time = timed(parser.recognize, string, True)
+        assert bitset_result == numpy_result
+        line = f"  {n:>5} symbols: bitsets {bitset_time:.3f}s, NumPy {numpy_time:.3f}s"
+        if n in naive_lengths:
+            naive_result, naive_time = timed(naive_cyk, grammar, string)
+            assert naive_result == bitset_result
+            line += f", naive {naive_time:.3f}s ({naive_time / bitset_time:.0f}x, {naive_time / numpy_time:.0f}x)"
+        print(line)
+
+
+def benchmark_normalize(sizes=(10_000, 20_000, 40_000), original_sizes=(500, 1000, 2000), one_head_sizes=(5_000, 10_000, 20_000)):
+    """Compare the worklist normalization with the original one on random grammars.
+    The original removal of null productions fails with a RuntimeError once it creates a unit production to a
+    nullable nonterminal, so the comparison uses grammars without ε productions. Grammars with all of their
+    long productions on one head show whether a step is quadratic in the productions of a nonterminal.
+    """
+    rng = random.Random(0)
+    print("normalize_to_chomsky_normal_form on random grammars")
+    for size in original_sizes:
+        grammar = random_grammar(rng, 20, size, list(string.ascii_uppercase[:20]), null_rate=0)
+        original = OriginalGrammar(set(grammar.VN), set(grammar.VT), {v: list(p) for v, p in grammar.P.items()}, grammar.S)
+        _, new_time = timed(normalize, grammar)
+        _, original_time = timed(normalize, original)
+        print(f"  {size:>6} productions, 20 nonterminals: worklists {new_time:.3f}s, original {original_time:.3f}s ({original_time / new_time:.0f}x)")
+    for size in sizes:
+        grammar = random_grammar(rng, size // 10, size)
+        _, new_time = timed(normalize, grammar)
+        print(f"  {size:>6} productions, {size // 10} nonterminals: worklists {new_time:.3f}s, "
+              f"{sum(map(len, grammar.P.values())):,} productions in CNF")
+    for size in one_head_sizes:
+        grammar = one_head_grammar(rng, size)
+        _, new_time = timed(normalize, grammar)
+        print(f"  {size:>6} long productions on one nonterminal: worklists {new_time:.3f}s")
+
+
+if __name__ == "__main__":
+    benchmark_cyk()
+    benchmark_normalize()
@@ -0,0 +1,177 @@
+import numpy as np
+from grammar import split_production
+
+
+class CYKParser:
+    """Class deciding membership and building parse trees for a grammar in Chomsky Normal Form with CYK.
+
+    Nonterminals get the ids 0..len(VN)-1 and a chart cell is a bitset of the ids deriving its substring.
+    Binary rules are indexed by their (B, C) body, mapping to the bitset of the heads having it.
+    Terminals found in binary bodies, such as in `D -> ab`, are treated as nonterminals deriving themselves.
+    """
+    def __init__(self, grammar):
+        self.S = grammar.S
+        self.symbols = sorted(grammar.VN)
+        ids = {v: i for i, v in enumerate(self.symbols)}
+        # terminal_heads[a] is the bitset of the nonterminals with a production a, the same for every string
+        self.terminal_heads = {}
+        # pairs[(B, C)] is the bitset of the nonterminals with a production BC
+        self.pairs = {}
+        self.accepts_empty = "" in grammar.P.get(self.S, [])
+
+        def symbol_id(symbol):
+            if symbol not in ids:
+                ids[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+                self.terminal_heads[symbol] = self.terminal_heads.get(symbol, 0) | 1 << ids[symbol]
+            return ids[symbol]
+
+        for v, values in grammar.P.items():
+            for value in values:
+                body = split_production(value, grammar.VN)
+                if len(body) == 1 and body[0] not in grammar.VN:
+                    self.terminal_heads[body[0]] = self.terminal_heads.get(body[0], 0) | 1 << ids[v]
+                elif len(body) == 2:
+                    pair = (symbol_id(body[0]), symbol_id(body[1]))
+                    self.pairs[pair] = self.pairs.get(pair, 0) | 1 << ids[v]
+                elif not (v == self.S and value == ""):
+                    raise ValueError(f"Production {v} -> {value} is not in Chomsky Normal Form")
+        self.nonterminals = len(grammar.VN)
+        self.start = ids[self.S]
+        # Binary rules grouped by the first symbol of their body, for the inner loop of the bitset chart
+        self.by_left = {}
+        for (left, right), heads in self.pairs.items():
+            self.by_left.setdefault(left, []).append((right, heads))
+
+    def _bitset_chart(self, string):
+        """Method to fill the chart with Python integers used as bitsets.
+
+        Besides the cells, ends[v][i] is the bitset of the positions k such that v derives string[i:k] and
+        starts[v][j] the bitset of the positions k such that v derives string[k:j]. A rule A -> BC derives
+        string[i:j] exactly when ends[B][i] & starts[C][j] is not zero, which checks every split at once.
+        """
+        n = len(string)
+        ends = [[0] * (n + 1) for _ in self.symbols]
+        starts = [[0] * (n + 1) for _ in self.symbols]
+
+        def add(cell, i, j):
+            while cell:
+                low = cell & -cell
+                v = low.bit_length() - 1
+                ends[v][i] |= 1 << j
+                starts[v][j] |= 1 << i
+                cell ^= low
+
+        for i, c in enumerate(string):
+            add(self.terminal_heads.get(c, 0), i, i + 1)
+        by_left = list(self.by_left.items())
+        for length in range(2, n + 1):
+            for i in range(n - length + 1):
+                j = i + length
+                cell = 0
+                for left, rules in by_left:
+                    left_ends = ends[left][i]
+                    if left_ends:
+                        for right, heads in rules:
+                            if heads & ~cell and left_ends & starts[right][j]:
+                                cell |= heads
+                add(cell, i, j)
+        return ends, starts
+
+    def _numpy_chart(self, string):
+        """Method to fill the chart like `_bitset_chart`, with the bitsets packed into NumPy arrays of 64-bit words.
+
+        For a string length l every start i is handled at once: a rule A -> BC derives string[i:i + l] when the
+        row ends[B, i] and the row starts[C, i + l] share a set bit, which is one AND over two slices of rows.
+        """
+        n = len(string)
+        words = (n >> 6) + 1
+        ends = np.zeros((len(self.symbols), n + 1, words), dtype=np.uint64)
+        starts = np.zeros((len(self.symbols), n + 1, words), dtype=np.uint64)
+        one = np.uint64(1)
+
+        def add(v, i, j):
+            ends[v, i, j >> 6] |= one << (j & 63).astype(np.uint64)
+            starts[v, j, i >> 6] |= one << (i & 63).astype(np.uint64)
+
+        positions = np.arange(n + 1)
+        codes = np.frombuffer(string.encode("utf-32-le"), dtype=np.uint32)
+        for c, cell in self.terminal_heads.items():
+            i = np.flatnonzero(codes == ord(c))
+            for v in range(len(self.symbols)):
+                if cell >> v & 1:
+                    add(v, i, i + 1)
+        rules = [(left, right, [v for v in range(len(self.symbols)) if heads >> v & 1]) for (left, right), heads in self.pairs.items()]
+        for length in range(2, n + 1):
+            i = positions[:n - length + 1]
+            for left, right, heads in rules:
+                derived = i[(ends[left, :n - length + 1] & starts[right, length:]).any(axis=1)]
+                if len(derived):
+                    for v in heads:
+                        add(v, derived, derived + length)
+        return ends, starts
+
+    def _chart(self, string, use_numpy):
+        """Method to fill the chart and return a function telling whether the symbol v derives string[i:j]
+        together with a function returning a split k such that B derives string[i:k] and C string[k:j], or None.
+        """
+        if use_numpy:
+            ends, starts = self._numpy_chart(string)
+
+            def derives(v, i, j):
+                return int(ends[v, i, j >> 6]) >> (j & 63) & 1 == 1
+
+            def split(left, right, i, j):
+                common = int.from_bytes((ends[left, i] & starts[right, j]).tobytes(), "little")
+                return (common & -common).bit_length() - 1 if common else None
+        else:
+            ends, starts = self._bitset_chart(string)
+
+            def derives(v, i, j):
+                return ends[v][i] >> j & 1 == 1
+
+            def split(left, right, i, j):
+                common = ends[left][i] & starts[right][j]
+                return (common & -common).bit_length() - 1 if common else None
+        return derives, split
+
+    def recognize(self, string, use_numpy=False) -> bool:
+        """Method to check if the string belongs to the language of the grammar."""
+        if string == "":
+            return self.accepts_empty
+        derives, _ = self._chart(string, use_numpy)
+        return derives(self.start, 0, len(string))
+
+    def parse(self, string, use_numpy=False):
+        """Method to build a parse tree of the string, or return None if it doesn't belong to the language.
+
+        A node is a tuple of a nonterminal and its children, a child being a node or a terminal.
+        Trees are built without recursion, so long strings don't hit the recursion limit.
+        """
+        if string == "":
+            return (self.S, "") if self.accepts_empty else None
+        derives, split = self._chart(string, use_numpy)
+        if not derives(self.start, 0, len(string)):
+            return None
+        nodes = []
+        stack = [(self.start, 0, len(string), None)]
+        while stack:
+            v, i, j, children = stack.pop()
+            if children is not None:
+                # Both children are built, they are the last two nodes
+                right, left = nodes.pop(), nodes.pop()
+                nodes.append((self.symbols[v], left, right))
+            elif v >= self.nonterminals:
+                nodes.append(self.symbols[v])
+            elif j - i == 1:
+                nodes.append((self.symbols[v], string[i]))
+            else:
+                for (left, right), heads in self.pairs.items():
+                    if heads >> v & 1:
+                        k = split(left, right, i, j)
+                        if k is not None:
+                            break
+                stack.append((v, i, j, (left, right)))
+                stack.append((right, k, j, None))
+                stack.append((left, i, k, None))
+        return nodes[0]
@@ -1,17 +1,158 @@
 import random
-from collections import defaultdict
+from collections import defaultdict, deque
+
+
+# Default maximum amount of combinations a production is expanded into when removing null productions
+MAX_COMBINATIONS = 1 << 10
+
+
+def split_production(production, VN, lengths=None):
+    """Function to split a production into its symbols, matching the longest nonterminal of VN first,
+    so multi-character nonterminals like `S'` or `a*` are one symbol and every other character is a terminal.
+    The distinct lengths of the nonterminals, longest first, can be passed when splitting many productions.
+    """
+    if lengths is None:
+        lengths = sorted({len(v) for v in VN}, reverse=True)
+    if lengths == [1]:
+        return list(production)
+    symbols, i = [], 0
+    while i < len(production):
+        for length in lengths:
+            if production[i:i + length] in VN:
+                break
+        else:
+            length = 1
+        symbols.append(production[i:i + length])
+        i += length
+    return symbols
+
+
+def nullable_combinations(body, nullable, cap=None):
+    """Function to generate the bodies, as tuples, obtained by removing any subset of the nullable symbols of body.
+    The first one is the body itself.
+
+    Combinations are streamed from a counter over the nullable positions, the first position varying slowest,
+    so only the current one is built. Raises ValueError if there would be more than `cap` of them.
+    Repeated nullable symbols can give the same body more than once.
+    """
+    positions = [i for i, symbol in enumerate(body) if symbol in nullable]
+    k = len(positions)
+    if cap is not None and 1 << k > cap:
+        raise ValueError(f"{body} has {k} nullable symbols, more than {cap} combinations")
+    for mask in range(1 << k):
+        dropped = {positions[j] for j in range(k) if mask >> (k - 1 - j) & 1}
+        yield tuple(symbol for i, symbol in enumerate(body) if i not in dropped)
+
+
+class Rule:
+    """Class representing a production, its head is a nonterminal id and its body a tuple of symbol ids."""
+    __slots__ = ("head", "body")
+
+    def __init__(self, head, body):
+        self.head = head
+        self.body = body
+
+    def __repr__(self):
+        return f"Rule({self.head}, {self.body})"
+
+
+class ProductionStore:
+    """Class storing the productions of a grammar with every symbol interned to a small integer.
+    Rules are indexed by their head, keeping the order they were added in, and by their body.
+    """
+    __slots__ = ("names", "ids", "rules", "by_body")
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        # rules[head] is the list of the rules of head, in order
+        self.rules = {}
+        # by_body[body][head] is the amount of rules of head with that body
+        self.by_body = defaultdict(dict)
+
+    @classmethod
+    def from_productions(cls, P, VN):
+        """Method to build a store from a dictionary of productions given as strings."""
+        store = cls()
+        lengths = sorted({len(v) for v in VN}, reverse=True)
+        for v, productions in P.items():
+            head = store.intern(v)
+            store.rules.setdefault(head, [])
+            for production in productions:
+                store.add(head, tuple(map(store.intern, split_production(production, VN, lengths))), unique=False)
+        return store
+
+    def intern(self, name):
+        """Method to return the id of a symbol, giving it the next id the first time."""
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+    def has(self, head, body):
+        """Method to check if head has a rule with the body."""
+        return head in self.by_body.get(body, ())
+
+    def heads(self, body):
+        """Method to return the ids of the nonterminals having a rule with the body."""
+        return list(self.by_body.get(body, ()))
+
+    def bodies(self, head):
+        """Method to return the bodies of the rules of head, in order."""
+        return [rule.body for rule in self.rules.get(head, [])]
+
+    def add(self, head, body, unique=True):
+        """Method to add a rule, unless head already has that body and `unique` is set. Returns if it was added."""
+        heads = self.by_body[body]
+        if unique and head in heads:
+            return False
+        heads[head] = heads.get(head, 0) + 1
+        self.rules.setdefault(head, []).append(Rule(head, body))
+        return True
+
+    def replace(self, head, bodies):
+        """Method to replace the rules of head with the given bodies, keeping their order."""
+        for rule in self.rules.get(head, []):
+            heads = self.by_body[rule.body]
+            heads[rule.head] -= 1
+            if heads[rule.head] == 0:
+                del heads[rule.head]
+        self.rules[head] = []
+        for body in bodies:
+            self.add(head, body, unique=False)
+
+    def to_productions(self):
+        """Method to convert the rules back to a dictionary of productions given as strings."""
+        names = self.names
+        return {names[head]: ["".join(names[symbol] for symbol in rule.body) for rule in rules] for head, rules in self.rules.items()}
+
 
 class Grammar:
-    """Class representing a generalized grammar."""
+    """Class representing a generalized grammar.
+    `P` is a plain dictionary of strings that can be edited in place. The transformations load it into a
+    `ProductionStore`, work on the interned rules and write the result back to `P`.
+    """
     def __init__(self, VN, VT, P, S="S"):
         self.VN = VN
         self.VT = VT
         self.P = P
         self.S = S
+        # The last number tried by `new_nonterminal` for every name
+        self.name_numbers = {}
+        self._load_store()
+
+    def _load_store(self):
+        """Method to build the store from `P`, picking up any edit made to it since the last transformation."""
+        self.store = ProductionStore.from_productions(self.P, self.VN)
+
+    def _save_store(self):
+        """Method to write the rules of the store back to `P`."""
+        self.P = self.store.to_productions()
 
     def __str__(self):
         """Printable representation of the grammar."""
-        rules = [f"{v} -> {', '.join(self.P[v])}" for v in self.P]
+        P = self.P
+        rules = [f"{v} -> {', '.join(P[v])}" for v in P]
         return f"Grammar:\nVN={self.VN}\nVT={self.VT}\nP={rules}\nS={self.S}"
 
     def to_dict(self) -> dict:
@@ -23,116 +164,207 @@ class Grammar:
             "S": self.S,
         }
         return grammar_dict
-    
+
+    def nonterminal_ids(self):
+        """Method to return the ids of the nonterminals in the store."""
+        return {self.store.intern(v) for v in self.VN}
+
+    def new_nonterminal(self, name):
+        """Method to add a new nonterminal named `name`, or `name` followed by a number if it is taken.
+        Numbers go on from the last one tried for the name, so adding many nonterminals with one name doesn't
+        try every taken number again. Returns its id.
+        """
+        number = self.name_numbers.get(name, 1)
+        candidate = name if number == 1 else f"{name}{number}"
+        while candidate in self.VN:
+            number += 1
+            candidate = f"{name}{number}"
+        self.name_numbers[name] = number
+        self.VN.add(candidate)
+        return self.store.intern(candidate)
+
     def start_symbol_check(self):
         """Method to check if the start symbol occurs on some right side of the productions.
         If it does, a new start symbol is created.
         """
-        if self.S in "".join([element for value_list in self.P.values() for element in value_list]):
+        self._load_store()
+        start = self.store.intern(self.S)
+        if any(start in rule.body for rules in self.store.rules.values() for rule in rules):
             new_start = f"{self.S}'"
             self.VN.add(new_start)
-            self.P[new_start] = [self.S]
+            self.store.add(self.store.intern(new_start), (start,))
             self.S = new_start
+        self._save_store()
 
-    def replace_all_combinations(self, value, node):
-        """Method that given a possible value and a node, removes the node from the value in all possibl combinations
-        and returns the new values.
+    def compute_nullable(self):
+        """Method to compute the nullable nonterminals with a worklist.
+        Every rule keeps the amount of its symbols not yet known to be nullable, and a nonterminal becoming
+        nullable only updates the rules it occurs in, so every symbol occurrence is visited once.
         """
-        if node not in value:
-            # If the node is not in the value, return the original value in a list
-            return [value]
-        
-        results = set()  # Using a set to avoid duplicate entries
-
-        # Recursive function to generate combinations by removing the node
-        def generate_combinations(current, start):
-            # Loop through the string and try removing the node at each position
-            for i in range(start, len(current)):
-                if current.startswith(node, i):
-                    # Remove the node and recursively call with the new string
-                    new_combination = current[:i] + current[i + len(node):]
-                    if new_combination not in results:
-                        results.add(new_combination)
-                        generate_combinations(new_combination, i)
-
-        # Start generating combinations from the initial value
-        generate_combinations(value, 0)
-
-        # Convert the set to a list and ensure the original value is removed
-        result_list = list(results)
-
-        if value in result_list:
-            result_list.remove(value)
-
-        return result_list
-
-    def remove_null_productions(self):
-        """Method to eliminate ε productions from the grammar."""
-        nullable = {v for v in self.VN if "" in self.P[v]}
-        
-        for node_with_empty in nullable:
-            for v in self.VN:
-                for production in self.P[v]:
-                    if node_with_empty in production:
-                        if production == node_with_empty:
-                            nullable.add(v)
-                        else:
-                            new_productions = self.replace_all_combinations(production, node_with_empty)
-                            self.P[v].extend(new_productions)
-            self.P[node_with_empty] = [production for production in self.P[node_with_empty] if production != ""]
+        self._load_store()
+        return {self.store.names[v] for v in self._nullable_ids()}
+
+    def _nullable_ids(self):
+        """Method to compute the ids of the nullable nonterminals, see `compute_nullable`."""
+        nonterminals = self.nonterminal_ids()
+        remaining = {}
+        occurrences = defaultdict(list)
+        nullable = set()
+        worklist = deque()
+        for rules in self.store.rules.values():
+            for rule in rules:
+                if all(symbol in nonterminals for symbol in rule.body):
+                    remaining[rule] = len(rule.body)
+                    for symbol in rule.body:
+                        occurrences[symbol].append(rule)
+                    if not rule.body and rule.head not in nullable:
+                        nullable.add(rule.head)
+                        worklist.append(rule.head)
+        while worklist:
+            symbol = worklist.popleft()
+            for rule in occurrences[symbol]:
+                remaining[rule] -= 1
+                if remaining[rule] == 0 and rule.head not in nullable:
+                    nullable.add(rule.head)
+                    worklist.append(rule.head)
+        return nullable
+
+    def _factor_nullable_tails(self, nullable, max_combinations=MAX_COMBINATIONS):
+        """Method to shorten productions having too many nullable symbols to be expanded in `max_combinations`.
+        The tail after the first nullable symbols allowed is replaced by a new nonterminal deriving it, which is
+        nullable when all of the tail is. New tails are shortened the same way, and `nullable`, a set of ids, is
+        updated. Works on the store loaded by `remove_null_productions`, which writes the result back to `P`.
+        A body keeps at least two nullable symbols, the last one being the new nonterminal, so `max_combinations`
+        must be at least 4. Raises ValueError otherwise.
+        """
+        if max_combinations < 4:
+            raise ValueError(f"max_combinations must be at least 4, got {max_combinations}")
+        limit = max_combinations.bit_length() - 1
+        worklist = deque(self.store.rules)
+        while worklist:
+            v = worklist.popleft()
+            bodies = self.store.bodies(v)
+            changed = False
+            for i, body in enumerate(bodies):
+                positions = [j for j, symbol in enumerate(body) if symbol in nullable]
+                if len(positions) > limit:
+                    cut = positions[limit - 2] + 1
+                    tail = body[cut:]
+                    new_state = self.new_nonterminal(f"{self.store.names[v]}*")
+                    self.store.add(new_state, tail)
+                    if all(symbol in nullable for symbol in tail):
+                        nullable.add(new_state)
+                    bodies[i] = body[:cut] + (new_state,)
+                    worklist.append(new_state)
+                    changed = True
+            if changed:
+                self.store.replace(v, bodies)
+
+    def remove_null_productions(self, max_combinations=MAX_COMBINATIONS):
+        """Method to eliminate ε productions from the grammar.
+        The nullable set is computed first, then every production is expanded once into the combinations
+        without some of its nullable symbols, appended after the original productions. Productions that would
+        give more than `max_combinations` are first shortened by `_factor_nullable_tails`, so it must be at least 4.
+        Every ε production is dropped, the start symbol's included, so the empty string leaves the language.
+        """
+        self._load_store()
+        nullable = self._nullable_ids()
+        self._factor_nullable_tails(nullable, max_combinations)
+        for v in list(self.store.rules):
+            bodies = self.store.bodies(v)
+            seen = set(bodies)
+            new_bodies = []
+            for body in bodies:
+                for combination in nullable_combinations(body, nullable, max_combinations):
+                    if combination and combination not in seen:
+                        seen.add(combination)
+                        new_bodies.append(combination)
+            self.store.replace(v, [body for body in bodies if body] + new_bodies)
+        self._save_store()
 
     def compute_unit_productions(self):
-        """Method to compute unit productions."""
-        unit_productions = {v for v in self.VN if any(len(p) == 1 and p in self.VN for p in self.P[v])}
-        return unit_productions
+        """Method to compute the nonterminals having unit productions."""
+        self._load_store()
+        nonterminals = self.nonterminal_ids()
+        return {self.store.names[v] for v, rules in self.store.rules.items() if any(len(rule.body) == 1 and rule.body[0] in nonterminals for rule in rules)}
 
     def remove_unit_productions(self):
-        """Method to remove unit productions from the grammar."""
-        while self.compute_unit_productions():
-            # replace the unit productions identified to the right side of the productions
-            unit_productions = self.compute_unit_productions()
-            for key in unit_productions:
-                for production in self.P[key]:
-                    if len(production) == 1 and production in self.VN:
-                        self.P[key].remove(production)
-                        self.P[key].extend(self.P[production])
+        """Method to remove unit productions from the grammar.
+        Every nonterminal keeps its other productions followed by those of the nonterminals it reaches through
+        unit productions, visited breadth first, without repetitions.
+        """
+        self._load_store()
+        nonterminals = self.nonterminal_ids()
+        units, non_units = {}, {}
+        for v in self.store.rules:
+            bodies = self.store.bodies(v)
+            units[v] = [body[0] for body in bodies if len(body) == 1 and body[0] in nonterminals]
+            non_units[v] = [body for body in bodies if not (len(body) == 1 and body[0] in nonterminals)]
+        for v in units:
+            reached, queue = {v}, deque(units[v])
+            new_bodies = list(non_units[v])
+            seen = set(new_bodies)
+            while queue:
+                u = queue.popleft()
+                if u in reached:
+                    continue
+                reached.add(u)
+                for body in non_units.get(u, []):
+                    if body not in seen:
+                        seen.add(body)
+                        new_bodies.append(body)
+                queue.extend(units.get(u, []))
+            self.store.replace(v, new_bodies)
+        self._save_store()
 
     def remove_two_or_more_symbols(self):
-        """Method to remove productions with more than 2 symbols."""
-        # extract violating productions
-        violating_productions = {v: [p for p in self.P[v] if len(p) > 2] for v in self.P}
-        new_productions = defaultdict(list)
-        for v in violating_productions:
-            for production in violating_productions[v]:
-                last_two = production[-2:]
-                if last_two not in new_productions:
-                    new_state = f"{v}*"
-                    self.VN.add(new_state)
-                    new_productions[last_two].append(new_state)
-                    self.P[new_state] = [last_two]
-        # replace the violating productions with the new productions
-        for production in new_productions:
-            for v in self.P:
-                for p in self.P[v]:
-                    if (p[-2:] == production) and (len(p) > 2):
-                        self.P[v].remove(p)
-                        p = p[:-2] + new_productions[production][0]
-                        self.P[v].append(p)
+        """Method to remove productions with more than 2 symbols.
+        The last two symbols of a long production are replaced by a nonterminal deriving them, until two symbols
+        are left. The nonterminals are indexed by the pair they derive, so every pair is created once.
+        """
+        self._load_store()
+        pairs = {}
+        for v in list(self.store.rules):
+            kept, rewritten = [], []
+            for body in self.store.bodies(v):
+                if len(body) <= 2:
+                    kept.append(body)
+                    continue
+                while len(body) > 2:
+                    pair = body[-2:]
+                    if pair not in pairs:
+                        pairs[pair] = self.new_nonterminal(f"{self.store.names[v]}*")
+                        self.store.add(pairs[pair], pair)
+                    body = body[:-2] + (pairs[pair],)
+                rewritten.append(body)
+            seen = set(kept)
+            self.store.replace(v, kept + [body for body in dict.fromkeys(rewritten) if body not in seen])
+        self._save_store()
 
     def remove_terminal_and_variable_productions(self):
-        """Method to remove terminal and variable productions."""
-        # fina all terminal symbols to be replaced
-        states_to_iterate = [key for key in self.P.keys()]
-        for v in states_to_iterate:
-            for i, production in enumerate(self.P[v]):
-                if (len(production) > 1) and (production.upper() != production) and (production.lower() != production):
-                    for symbol in production:
-                        if symbol in self.VT:
-                            new_state = f"{symbol}*"
+        """Method to remove terminal and variable productions.
+        Terminals of productions also having nonterminals are replaced by a nonterminal deriving only them.
+        """
+        self._load_store()
+        nonterminals = self.nonterminal_ids()
+        terminals = {self.store.intern(t) for t in self.VT}
+        for v in list(self.store.rules):
+            bodies = self.store.bodies(v)
+            for i, body in enumerate(bodies):
+                if len(body) > 1 and any(symbol in nonterminals for symbol in body) and any(symbol in terminals for symbol in body):
+                    new_body = []
+                    for symbol in body:
+                        if symbol in terminals:
+                            new_state = f"{self.store.names[symbol]}*"
                             if new_state not in self.VN:
                                 self.VN.add(new_state)
-                                self.P[new_state] = [symbol]
-                            self.P[v][i] = production.replace(symbol, new_state)
+                                nonterminals.add(self.store.intern(new_state))
+                                self.store.add(self.store.intern(new_state), (symbol,))
+                            symbol = self.store.intern(new_state)
+                        new_body.append(symbol)
+                    bodies[i] = tuple(new_body)
+            self.store.replace(v, bodies)
+        self._save_store()
 
     def normalize_to_chomsky_normal_form(self):
         """Method to normalize to Chomsky Normal Form."""
@@ -0,0 +1,81 @@
+import itertools
+import unittest
+from cyk_parser import CYKParser
+from grammar import Grammar, split_production
+
+
+class TestCYKParser(unittest.TestCase):
+    def setUp(self):
+        self.grammar = Grammar(
+            VN={"S", "A", "B", "C", "D", "E"},
+            VT={"a", "b"},
+            P={
+                "S": ["aB", "AC"],
+                "A": ["a", "ASC", "BC", "aD"],
+                "B": ["b", "bS"],
+                "C": ["", "BA"],
+                "E": ["aB"],
+                "D": ["abC"]
+            },
+        )
+        self.grammar.normalize_to_chomsky_normal_form()
+        self.parser = CYKParser(self.grammar)
+
+    def naive_recognize(self, string):
+        """Set based CYK over the productions of the grammar, trying every rule for every split."""
+        n = len(string)
+        table = {(i, i + 1): {v for v in self.grammar.P if string[i] in self.grammar.P[v]} | {string[i]} for i in range(n)}
+        for length in range(2, n + 1):
+            for i in range(n - length + 1):
+                cell = set()
+                for k in range(i + 1, i + length):
+                    for v, productions in self.grammar.P.items():
+                        for production in productions:
+                            body = split_production(production, self.grammar.VN)
+                            if len(body) == 2 and body[0] in table[(i, k)] and body[1] in table[(k, i + length)]:
+                                cell.add(v)
+                table[(i, i + length)] = cell
+        return self.grammar.S in table[(0, n)]
+
+    def test_recognize(self):
+        """Test that both charts agree with a naive CYK on every string of up to 8 symbols."""
+        accepted = 0
+        for n in range(1, 9):
+            for string in map("".join, itertools.product("ab", repeat=n)):
+                expected = self.naive_recognize(string)
+                accepted += expected
+                self.assertEqual(self.parser.recognize(string), expected, string)
+                self.assertEqual(self.parser.recognize(string, use_numpy=True), expected, string)
+        self.assertGreater(accepted, 0)
+        self.assertFalse(self.parser.recognize(""))
+        self.assertFalse(self.parser.recognize("abc"))
+
+    def test_parse(self):
+        """Test that parse trees use the productions of the grammar and give back the string."""
+        def check(node):
+            if isinstance(node, str):
+                return node
+            head, children = node[0], node[1:]
+            body = [check(child) for child in children]
+            symbols = [child if isinstance(child, str) else child[0] for child in children]
+            self.assertIn("".join(symbols), self.grammar.P[head])
+            return "".join(body)
+
+        for string in ["ab", "aab", "abba", "ababbab", "bbbab" * 20 + "a"]:
+            for use_numpy in (False, True):
+                tree = self.parser.parse(string, use_numpy)
+                if self.parser.recognize(string):
+                    self.assertEqual(tree[0], self.grammar.S)
+                    self.assertEqual(check(tree), string)
+                else:
+                    self.assertIsNone(tree)
+        self.assertIsNone(self.parser.parse("abc"))
+        self.assertIsNone(self.parser.parse("abc", use_numpy=True))
+
+    def test_not_chomsky_normal_form(self):
+        with self.assertRaises(ValueError):
+            CYKParser(Grammar({"S"}, {"a"}, {"S": ["aSa", "a"]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import contextlib
+import io
+import itertools
 import unittest
-from grammar import Grammar
+from cyk_parser import CYKParser
+from grammar import MAX_COMBINATIONS, Grammar, ProductionStore, nullable_combinations
 
 class TestGrammar(unittest.TestCase):
     def test_start_symbol_check(self):
@@ -173,6 +177,182 @@ class TestGrammar(unittest.TestCase):
         grammar.remove_terminal_and_variable_productions()
         self.assertEqual(grammar.to_dict(), expected_result)
 
+    def test_compute_nullable(self):
+        VN = {"S", "A", "B", "C"}
+        VT = {"a"}
+        P = {
+            "S": ["AB", "a"],
+            "A": ["BC", "a"],
+            "B": ["", "aB"],
+            "C": ["B"]
+        }
+
+        grammar = Grammar(VN, VT, P)
+        self.assertEqual(grammar.compute_nullable(), {"S", "A", "B", "C"})
+
+    def test_remove_unit_productions_with_cycle(self):
+        VN = {"S", "A", "B"}
+        VT = {"a", "b"}
+        P = {
+            "S": ["A", "aS"],
+            "A": ["B", "a"],
+            "B": ["A", "S", "b"]
+        }
+
+        expected_result = {
+            "VN": {"S", "A", "B"},
+            "VT": {"a", "b"},
+            "P": {
+                "S": ["aS", "a", "b"],
+                "A": ["a", "b", "aS"],
+                "B": ["b", "a", "aS"]
+            },
+            "S": "S"
+        }
+
+        grammar = Grammar(VN, VT, P)
+        grammar.remove_unit_productions()
+        self.assertEqual(grammar.to_dict(), expected_result)
+
+    def test_remove_two_or_more_symbols_long_productions(self):
+        VN = {"S", "A", "B"}
+        VT = {"a", "b"}
+        P = {
+            "S": ["ABAB", "AB"],
+            "A": ["a", "BAB"],
+            "B": ["b"]
+        }
+
+        expected_result = {
+            "VN": {"S", "A", "B", "S*", "S*2"},
+            "VT": {"a", "b"},
+            "P": {
+                "S": ["AB", "AS*2"],
+                "A": ["a", "BS*"],
+                "B": ["b"],
+                "S*": ["AB"],
+                "S*2": ["BS*"]
+            },
+            "S": "S"
+        }
+
+        grammar = Grammar(VN, VT, P)
+        grammar.remove_two_or_more_symbols()
+        self.assertEqual(grammar.to_dict(), expected_result)
+
+    def test_production_store(self):
+        VN = {"S'", "S", "A*", "a*", "A"}
+        VT = {"a", "b"}
+        P = {
+            "S'": ["S", ""],
+            "S": ["a*A*", "aSb", "aSb", "A"],
+            "A*": ["AS"],
+            "a*": ["a"],
+            "A": []
+        }
+
+        store = ProductionStore.from_productions(P, VN)
+        ids = store.ids
+        self.assertEqual(store.to_productions(), P)
+        self.assertEqual(store.bodies(ids["S"])[0], (ids["a*"], ids["A*"]))
+        self.assertEqual(store.heads((ids["a"],)), [ids["a*"]])
+        self.assertTrue(store.has(ids["S'"], ()))
+        self.assertFalse(store.add(ids["S"], (ids["A"],)))
+        store.replace(ids["S"], [(ids["a"],)])
+        self.assertFalse(store.has(ids["S"], (ids["a*"], ids["A*"])))
+        self.assertEqual(sorted(store.heads((ids["a"],))), sorted([ids["a*"], ids["S"]]))
+
+        grammar = Grammar(VN, VT, P, "S'")
+        self.assertEqual(Grammar(VN, VT, grammar.to_dict()["P"], "S'").to_dict(), grammar.to_dict())
+
+        # Productions edited in place are used by the next transformation
+        grammar = Grammar({"S", "A"}, {"a", "b"}, {"S": ["A"], "A": ["a"]})
+        grammar.P["A"].append("b")
+        self.assertEqual(grammar.P["A"], ["a", "b"])
+        grammar.remove_unit_productions()
+        self.assertEqual(grammar.P["S"], ["a", "b"])
+
+    def test_nullable_combinations(self):
+        combinations = nullable_combinations(("a", "B", "C", "B"), {"B", "C"}, cap=8)
+        self.assertEqual(next(combinations), ("a", "B", "C", "B"))
+        self.assertEqual(list(combinations), [
+            ("a", "B", "C"), ("a", "B", "B"), ("a", "B"), ("a", "C", "B"), ("a", "C"), ("a", "B"), ("a",)
+        ])
+        with self.assertRaises(ValueError):
+            list(nullable_combinations(("a", "B", "C", "B"), {"B", "C"}, cap=4))
+
+    def test_remove_null_productions_with_cap(self):
+        VN = {"S", "A", "B"}
+        VT = {"a", "b"}
+        P = {
+            "S": ["aABABABABABA", "b"],
+            "A": ["", "a"],
+            "B": ["", "bS"]
+        }
+
+        grammar = Grammar(set(VN), set(VT), dict(P))
+        grammar.remove_null_productions(max_combinations=16)
+        self.assertLessEqual(len(grammar.P["S"]), 2 + 16)
+        self.assertNotIn("", [p for productions in grammar.P.values() for p in productions])
+
+        # The shortened grammar derives the same strings as the one expanded without a cap
+        parsers = []
+        for max_combinations in (16, 1 << 12):
+            grammar = Grammar(set(VN), set(VT), dict(P))
+            with contextlib.redirect_stdout(io.StringIO()):
+                grammar.start_symbol_check()
+                grammar.remove_null_productions(max_combinations)
+                grammar.remove_unit_productions()
+                grammar.remove_two_or_more_symbols()
+                grammar.remove_terminal_and_variable_productions()
+            parsers.append(CYKParser(grammar))
+        for n in range(1, 7):
+            for string in map("".join, itertools.product("ab", repeat=n)):
+                self.assertEqual(parsers[0].recognize(string), parsers[1].recognize(string), string)
+
+    def test_remove_null_productions_with_small_cap(self):
+        VN = {"S", "A", "B"}
+        VT = {"a", "b"}
+        P = {
+            "S": ["aABAB", "b"],
+            "A": ["", "a"],
+            "B": ["", "b"]
+        }
+
+        for max_combinations in (1, 2, 3):
+            grammar = Grammar(set(VN), set(VT), dict(P))
+            with self.assertRaises(ValueError):
+                grammar.remove_null_productions(max_combinations)
+            # The grammar is left unchanged
+            self.assertEqual(grammar.P, P)
+
+        # The smallest cap accepted keeps two nullable symbols per body and derives the same strings
+        parsers = []
+        for max_combinations in (4, MAX_COMBINATIONS):
+            grammar = Grammar(set(VN), set(VT), dict(P))
+            with contextlib.redirect_stdout(io.StringIO()):
+                grammar.start_symbol_check()
+                grammar.remove_null_productions(max_combinations)
+                grammar.remove_unit_productions()
+                grammar.remove_two_or_more_symbols()
+                grammar.remove_terminal_and_variable_productions()
+            parsers.append(CYKParser(grammar))
+        for n in range(1, 6):
+            for string in map("".join, itertools.product("ab", repeat=n)):
+                self.assertEqual(parsers[0].recognize(string), parsers[1].recognize(string), string)
+
+    def test_remove_null_productions_drops_start_empty(self):
+        VN = {"S", "A"}
+        VT = {"a"}
+        P = {
+            "S": ["", "aA"],
+            "A": ["", "a"]
+        }
+
+        grammar = Grammar(VN, VT, P)
+        grammar.remove_null_productions()
+        self.assertEqual(grammar.P, {"S": ["aA", "a"], "A": ["a"]})
+
 if __name__ == "__main__":
     unittest.main()
     
\ No newline at end of file
@@ -0,0 +1,71 @@
+import unittest
+from collections import Counter
+from grammar import Grammar, split_production
+from uniform_sampler import UniformSampler
+
+
+def derivations(grammar, n):
+    """All the strings of length n of every leftmost derivation, found by brute force."""
+    results = []
+    stack = [[grammar.S]]
+    while stack:
+        form = stack.pop()
+        terminal_length = sum(1 for symbol in form if symbol not in grammar.VN)
+        if terminal_length > n or len(form) > n:
+            continue
+        position = next((i for i, symbol in enumerate(form) if symbol in grammar.VN), None)
+        if position is None:
+            if len(form) == n:
+                results.append("".join(form))
+            continue
+        for production in grammar.P[form[position]]:
+            stack.append(form[:position] + split_production(production, grammar.VN) + form[position + 1:])
+    return results
+
+
+class TestUniformSampler(unittest.TestCase):
+    def test_regular_grammar(self):
+        """Test of counting and sampling based on the first lab's grammar."""
+        grammar = Grammar(
+            VN={"S", "P", "Q"},
+            VT={"a", "b", "c", "d", "e", "f"},
+            P={"S": ["aP", "bQ"], "P": ["bP", "cP", "dQ", "e"], "Q": ["eQ", "fQ", "a"]},
+        )
+        sampler = UniformSampler(grammar)
+        for n in range(1, 8):
+            self.assertEqual(sampler.count(n), len(derivations(grammar, n)))
+        strings = set(derivations(grammar, 4))
+        samples = Counter(sampler.sample_many(4, 3000, seed=0))
+        self.assertEqual(set(samples), strings)
+        # 3000 samples over 14 strings, every string is expected about 214 times
+        self.assertTrue(all(120 < amount < 320 for amount in samples.values()))
+        self.assertEqual(list(sampler.sample_many(30, 5, seed=1)), list(sampler.sample_many(30, 5, seed=1)))
+
+    def test_chomsky_normal_form(self):
+        """Test of counting and sampling based on the Chomsky Normal Form of the lab's example grammar."""
+        grammar = Grammar(
+            VN={"S0", "S", "A", "B", "a*"},
+            VT={"a", "b"},
+            P={"S0": ["AB", "SS"], "S": ["AB", "SS"], "A": ["a"], "B": ["b", "a*S"], "a*": ["a"]},
+            S="S0",
+        )
+        sampler = UniformSampler(grammar)
+        for n in range(1, 9):
+            self.assertEqual(sampler.count(n), len(derivations(grammar, n)))
+        self.assertEqual(sampler.count(0), 0)
+        for string in sampler.sample_many(8, 200, seed=2):
+            self.assertIn(string, derivations(grammar, 8))
+        self.assertGreater(sampler.count(200), 2 ** 64)
+        self.assertEqual(len(sampler.sample(200)), 200)
+        with self.assertRaises(ValueError):
+            sampler.sample(1)
+
+    def test_rejects_null_and_unit_productions(self):
+        with self.assertRaises(ValueError):
+            UniformSampler(Grammar({"S"}, {"a"}, {"S": ["aS", ""]}))
+        with self.assertRaises(ValueError):
+            UniformSampler(Grammar({"S", "A"}, {"a"}, {"S": ["A"], "A": ["a"]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
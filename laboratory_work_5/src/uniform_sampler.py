@@ -0,0 +1,116 @@
+import random
+from grammar import split_production
+
+
+class UniformSampler:
+    """Class counting the derivations of a grammar by the length of their string and sampling them uniformly.
+
+    Works with any grammar having `VN`, `P` and `S` without ε or unit productions, such as the regular grammars
+    of the first two labs or the output of `Grammar.normalize_to_chomsky_normal_form`. Every derivation of a
+    length is equally likely, so for unambiguous grammars, like the regular ones, every string is.
+    Counts are exact Python integers and the tables grow on demand up to the longest length asked for.
+    """
+    def __init__(self, grammar):
+        self.VN = set(grammar.VN)
+        self.S = grammar.S
+        # counts[v][n] is the amount of derivations of v giving a string of length n
+        self.counts = {v: [0] for v in self.VN}
+        self.productions = {v: [] for v in self.VN}
+        # suffixes[v][i][k][n] is the amount of derivations of length n of the i-th production of v from its k-th symbol on
+        self.suffixes = {v: [] for v in self.VN}
+        for v, values in grammar.P.items():
+            for value in values:
+                production = tuple(split_production(value, self.VN))
+                if not production:
+                    raise ValueError(f"Null production {v} -> ε, remove null productions first")
+                if len(production) == 1 and production[0] in self.VN:
+                    raise ValueError(f"Unit production {v} -> {value}, remove unit productions first")
+                suffix = [[0] for _ in production] + [[1]]
+                if production[-1] in self.VN:
+                    # The last symbol alone derives exactly what it derives, so its row is its counts row
+                    suffix[-2] = self.counts[production[-1]]
+                self.productions[v].append(production)
+                self.suffixes[v].append(suffix)
+
+    def _extend(self, n):
+        """Method to extend the tables up to the length n.
+
+        Every symbol derives at least one character, so the row of a symbol followed by others only reads shorter
+        lengths. Rows are filled from the last symbol to the first and the counts rows last.
+        """
+        for length in range(len(self.counts[self.S]), n + 1):
+            for v in self.VN:
+                total = 0
+                for production, suffix in zip(self.productions[v], self.suffixes[v]):
+                    suffix[-1].append(0)
+                    last = len(production) - 1 if production[-1] in self.VN else len(production)
+                    for k in range(last - 1, -1, -1):
+                        suffix[k].append(self._suffix_count(production[k], suffix[k + 1], length))
+                    total += suffix[0][length]
+                self.counts[v].append(total)
+
+    def _suffix_count(self, symbol, rest, length):
+        """Method to count the derivations of length `length` of `symbol` followed by the symbols counted in `rest`."""
+        if symbol not in self.VN:
+            return rest[length - 1]
+        counts = self.counts[symbol]
+        return sum(counts[m] * rest[length - m] for m in range(1, length) if rest[length - m])
+
+    def count(self, n) -> int:
+        """Method to count the derivations of the start symbol giving a string of length n."""
+        self._extend(n)
+        return self.counts[self.S][n]
+
+    def sample(self, n, rng=random) -> str:
+        """Method to return the string of a uniformly random derivation of length n.
+
+        Productions, and the length every nonterminal derives, are picked with probabilities proportional to their
+        counts. Lengths are tried from both ends of their range, so for regular grammars a sample takes O(n) steps.
+        """
+        if self.count(n) == 0:
+            raise ValueError(f"The grammar derives no string of length {n}")
+        string = []
+        stack = [(self.S, n)]
+        while stack:
+            symbol, length = stack.pop()
+            if symbol not in self.VN:
+                string.append(symbol)
+                continue
+            pick = rng.randrange(self.counts[symbol][length])
+            for production, suffix in zip(self.productions[symbol], self.suffixes[symbol]):
+                if pick < suffix[0][length]:
+                    break
+                pick -= suffix[0][length]
+            children = []
+            for k, child in enumerate(production):
+                if child not in self.VN:
+                    child_length = 1
+                elif k == len(production) - 1:
+                    child_length = length
+                else:
+                    child_length = self._pick_length(child, suffix[k + 1], length, rng.randrange(suffix[k][length]))
+                children.append((child, child_length))
+                length -= child_length
+            stack.extend(reversed(children))
+        return "".join(string)
+
+    def _pick_length(self, symbol, rest, length, pick):
+        """Method to pick the length derived by `symbol` when it and the symbols counted in `rest` derive `length`.
+        Candidates alternate between the shortest and the longest remaining ones.
+        """
+        counts = self.counts[symbol]
+        low, high = 1, length - 1
+        while low <= high:
+            for m in (low, high) if low < high else (low,):
+                weight = counts[m] * rest[length - m]
+                if pick < weight:
+                    return m
+                pick -= weight
+            low, high = low + 1, high - 1
+        raise AssertionError("The picked derivation is out of range")
+
+    def sample_many(self, n, k, seed=None):
+        """Method to generate k uniformly random strings of length n, one at a time, from a seeded generator."""
+        rng = random.Random(seed)
+        for _ in range(k):
+            yield self.sample(n, rng)
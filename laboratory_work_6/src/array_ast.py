@@ -0,0 +1,153 @@
+from array import array
+from evaluator import OPCODE_FUNCTIONS, OPCODES, OPERATORS, unique_postorder
+from parser_class import BinOp, Num, PrecedenceParser
+from tokenner import Tokenner, TokenType
+
+
+# Opcode of the number nodes, the operators having the negative opcodes of `evaluator.OPCODES`
+NUM = 0
+
+# The text of the operator tokens, to rebuild them
+SYMBOLS = {
+    TokenType.PLUS: "+",
+    TokenType.MINUS: "-",
+    TokenType.MUL: "*",
+    TokenType.DIV: "/",
+}
+
+
+class ArrayAST:
+    """Class storing an AST as parallel arrays, a node being an int id.
+
+    Node i has the opcode opcodes[i], NUM for numbers and the negative opcode of its operator for binary operations.
+    A number has its value in values[i], an operation its children ids in left[i] and right[i], so a node takes
+    25 bytes of the arrays, about 26 with the spare room the arrays keep to grow. Children are always added before
+    their parent, so the ids are in post-order and traversals are plain loops over the arrays. Numbers not fitting
+    in 64 bits are kept by their id in the `large` dictionary.
+    """
+    __slots__ = ("opcodes", "left", "right", "values", "large", "root")
+
+    def __init__(self):
+        self.opcodes = array("b")
+        self.left = array("q")
+        self.right = array("q")
+        self.values = array("q")
+        self.large = {}
+        self.root = None
+
+    def __str__(self):
+        """String representation of the class instance."""
+        return f"ArrayAST({len(self)} nodes)"
+
+    def __repr__(self):
+        """String representation of the class instance."""
+        return self.__str__()
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def add_num(self, value):
+        """Method to add a number node and return its id."""
+        if not -1 << 63 <= value < 1 << 63:
+            self.large[len(self.opcodes)] = value
+            value = 0
+        self.opcodes.append(NUM)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.values.append(value)
+        return len(self.opcodes) - 1
+
+    def add_binop(self, op_type, left, right):
+        """Method to add a binary operation node on two existing nodes and return its id."""
+        self.opcodes.append(OPCODES[op_type])
+        self.left.append(left)
+        self.right.append(right)
+        self.values.append(0)
+        return len(self.opcodes) - 1
+
+    def value(self, i):
+        """Method to return the value of the number node i."""
+        return self.large[i] if i in self.large else self.values[i]
+
+    def op_type(self, i):
+        """Method to return the operator type of the operation node i."""
+        return OPERATORS[-self.opcodes[i] - 1]
+
+    @classmethod
+    def from_ast(cls, root):
+        """Build the arrays of a class-based AST. Nodes shared in a DAG made by `optimizer.optimize` stay shared."""
+        tree = cls()
+        ids = {}
+        for node in unique_postorder(root):
+            if isinstance(node, Num):
+                ids[id(node)] = tree.add_num(node.value)
+            else:
+                ids[id(node)] = tree.add_binop(node.op.type, ids[id(node.left)], ids[id(node.right)])
+        tree.root = ids[id(root)]
+        return tree
+
+    def reachable(self, root):
+        """Method to mark the nodes of the subtree of `root`, returning a bytearray with a 1 at their ids.
+        Every node of the subtree has a smaller id than the root, so one backwards loop finds them all.
+        """
+        needed = bytearray(root + 1)
+        needed[root] = 1
+        opcodes, left, right = self.opcodes, self.left, self.right
+        for i in range(root, -1, -1):
+            if needed[i] and opcodes[i] != NUM:
+                needed[left[i]] = needed[right[i]] = 1
+        return needed
+
+    def to_ast(self, root=None):
+        """Method to build the class-based AST of the node `root`, the root of the tree by default.
+        Shared nodes give shared objects.
+        """
+        root = self.root if root is None else root
+        nodes = {}
+        needed = self.reachable(root)
+        for i in range(root + 1):
+            if not needed[i]:
+                continue
+            if self.opcodes[i] == NUM:
+                nodes[i] = Num(Tokenner(TokenType.INTEGER, self.value(i)))
+            else:
+                op_type = self.op_type(i)
+                nodes[i] = BinOp(left=nodes[self.left[i]], op=Tokenner(op_type, SYMBOLS[op_type]), right=nodes[self.right[i]])
+        return nodes[root]
+
+    def evaluate(self, root=None):
+        """Method to compute the value of the node `root`, the root of the tree by default, like `evaluator.evaluate`.
+        Values are computed in one loop over the ids of the subtree.
+        """
+        root = self.root if root is None else root
+        functions = OPCODE_FUNCTIONS
+        opcodes, left, right = self.opcodes, self.left, self.right
+        values = self.values.tolist()
+        for i, value in self.large.items():
+            values[i] = value
+        needed = self.reachable(root)
+        for i in range(root + 1):
+            opcode = opcodes[i]
+            if opcode != NUM and needed[i]:
+                values[i] = functions[-opcode](values[left[i]], values[right[i]])
+        return values[root]
+
+
+class ArrayParser(PrecedenceParser):
+    """Parser building an `ArrayAST` directly, without making `Num` and `BinOp` nodes."""
+    def __init__(self, lexer):
+        super().__init__(lexer)
+        self.tree = ArrayAST()
+
+    def num(self, token):
+        """Add the node of a number to the tree."""
+        return self.tree.add_num(token.value)
+
+    def binop(self, left, op, right):
+        """Add the node of a binary operation to the tree."""
+        return self.tree.add_binop(op.type, left, right)
+
+    def parse(self):
+        """Parse the input text into the tree and return it."""
+        self.tree.root = super().parse()
+        return self.tree
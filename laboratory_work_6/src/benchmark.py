@@ -0,0 +1,265 @@
+import importlib.util
+import io
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from graphviz import Digraph
+from array_ast import ArrayParser
+from dfa_lexer import DFALexer
+from dot_writer import write_dot
+from evaluator import compile_ast, evaluate
+from expression_cache import ExpressionCache, parse_expression
+from optimizer import count_nodes, optimize
+from lexer import Lexer, tokenize_stream
+from parser_class import Parser, PrecedenceParser
+from token_buffer import TokenBuffer
+
+
+def load_lab_3_lexer():
+    """The character by character `Lexer` of the third laboratory work, loaded from its file.
+    Its `tokenner` import resolves to this lab's `tokenner`, which is the same module.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "laboratory_work_3", "src", "lexer.py")
+    spec = importlib.util.spec_from_file_location("lab_3_lexer", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Lexer
+
+
+def random_expression(rng, size):
+    """A random arithmetic expression of about `size` characters."""
+    parts = []
+    length = 0
+    while length < size:
+        part = rng.choice([str(rng.randrange(10 ** rng.randint(1, 6))), " + ", "-", " * ", "/", "(", ")", " ", "\n"])
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def timed(function, *args, repeat=1):
+    """Run the function `repeat` times and return its result together with the best elapsed time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def traced(function, *args):
+    """Run the function and return its result, the elapsed time in seconds and the memory it still holds in bytes."""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, held
+
+
+def benchmark_lexers(sizes=(1_000_000, 4_000_000)):
+    """Compare the regex lexer, the DFA lexer and the lexer of the third laboratory work on random expressions."""
+    lab_3_lexer = load_lab_3_lexer()
+    rng = random.Random(0)
+    print("Tokenizing random expressions")
+    for size in sizes:
+        text = random_expression(rng, size)
+        regex_tokens, regex_time = timed(lambda: Lexer(text).tokens)
+        dfa_tokens, dfa_time = timed(lambda: DFALexer(text).tokens)
+        lab_3_tokens, lab_3_time = timed(lambda: lab_3_lexer(text).tokenize())
+        assert regex_tokens == dfa_tokens == lab_3_tokens
+        print(f"  {size / 1e6:.0f} MB, {len(regex_tokens):,} tokens: regex {regex_time:.2f}s, DFA {dfa_time:.2f}s, "
+              f"lab 3 {lab_3_time:.2f}s")
+
+
+def benchmark_token_storage(size=1_000_000):
+    """Compare the memory held by the token list of `Lexer` and by a `TokenBuffer`, without the source text."""
+    text = random_expression(random.Random(0), size)
+    tokens, list_time, list_memory = traced(lambda: Lexer(text).tokens)
+    buffer, buffer_time, buffer_memory = traced(TokenBuffer, text)
+    assert len(tokens) == len(buffer)
+    print(f"Token storage, {len(tokens):,} tokens (times measured under tracemalloc)")
+    print(f"  Tokenner list: {list_memory / len(tokens):.0f} bytes per token, {list_time:.2f}s")
+    print(f"  TokenBuffer: {buffer_memory / len(tokens):.0f} bytes per token, {buffer_time:.2f}s")
+
+
+def parse_tokens(parser_class, lexer):
+    """Parse the tokens of a lexer from the start with the given parser class."""
+    lexer.pos = 0
+    return parser_class(lexer).parse()
+
+
+def benchmark_parsers(sizes=(100_000, 1_000_000), depths=(100, 1_000, 100_000)):
+    """Compare the recursive parser and the precedence parser on flat and nested expressions, lexing excluded."""
+    rng = random.Random(0)
+    print("Parsing flat expressions")
+    for size in sizes:
+        text = " ".join(str(rng.randrange(100)) + " " + rng.choice("+-*/") for _ in range(size)) + " 1"
+        lexer = Lexer(text)
+        _, recursive_time = timed(parse_tokens, Parser, lexer, repeat=3)
+        _, precedence_time = timed(parse_tokens, PrecedenceParser, lexer, repeat=3)
+        print(f"  {len(lexer.tokens):,} tokens: recursive {recursive_time:.2f}s, precedence {precedence_time:.2f}s")
+    print("Parsing nested expressions")
+    for depth in depths:
+        lexer = Lexer("1 - (" * depth + "2" + ")" * depth)
+        try:
+            _, recursive_time = timed(parse_tokens, Parser, lexer)
+            recursive = f"{recursive_time:.3f}s"
+        except RecursionError:
+            recursive = "RecursionError"
+        _, precedence_time = timed(parse_tokens, PrecedenceParser, lexer)
+        print(f"  depth {depth:,}: recursive {recursive}, precedence {precedence_time:.3f}s")
+
+
+def benchmark_evaluation(text="723 + 3 * (120 / (12 / (3 + 1) - 1)) - 45 * 2", rows=100_000):
+    """Compare evaluating an expression many times by parsing it again, walking its AST, running its compiled
+    program and running the program once over all the rows with NumPy.
+    """
+    ast = Parser(Lexer(text)).parse()
+    program = compile_ast(ast)
+    rng = np.random.default_rng(0)
+    constants = rng.uniform(1, 100, size=(rows, len(program.constants)))
+    constant_rows = constants.tolist()
+    _, parse_time = timed(lambda: [evaluate(Parser(Lexer(text)).parse()) for _ in range(rows)])
+    _, walk_time = timed(lambda: [evaluate(ast) for _ in range(rows)])
+    results, run_time = timed(lambda: [program.run(row) for row in constant_rows])
+    batch, batch_time = timed(program.run_batch, constants)
+    assert np.allclose(results, batch)
+    print(f"Evaluating {text!r} {rows:,} times")
+    print(f"  parse and walk {parse_time:.2f}s, walk {walk_time:.2f}s, program {run_time:.2f}s, "
+          f"NumPy batch {batch_time:.4f}s")
+
+
+def benchmark_expression_cache(distinct=500, requests=100_000, maxsize=1024):
+    """Compare parsing every request with getting it from an `ExpressionCache`, for requests drawn from a small
+    set of expressions written with varying whitespace.
+    """
+    rng = random.Random(0)
+    expressions = [f"{rng.randrange(1000)} + {rng.randrange(1000)} * ({rng.randrange(1000)} - {rng.randrange(1, 1000)})"
+                   for _ in range(distinct)]
+    texts = [rng.choice(expressions).replace(" ", rng.choice(["", " ", "  "])) for _ in range(requests)]
+    cache = ExpressionCache(maxsize=maxsize)
+    _, parse_time = timed(lambda: [parse_expression(text) for text in texts])
+    _, cache_time = timed(lambda: [cache.get(text) for text in texts])
+    info = cache.info()
+    print(f"{requests:,} requests over {distinct} expressions: parsing {parse_time:.2f}s, cache {cache_time:.2f}s, "
+          f"{info['hits']:,} hits, {info['misses']:,} misses")
+
+
+def benchmark_optimizer(terms=100_000, distinct=100):
+    """Measure `optimize` on a machine generated sum of terms drawn from a small set of subexpressions,
+    with and without constant folding.
+    """
+    rng = random.Random(0)
+    pool = [f"({rng.randrange(1, 50)} * {rng.randrange(1, 50)} / ({rng.randrange(1, 50)} + {rng.randrange(1, 50)}))"
+            for _ in range(distinct)]
+    text = " + ".join(rng.choice(pool) for _ in range(terms))
+    ast, ast_time, ast_memory = traced(parse_expression, text)
+    _, walk_time = timed(evaluate, ast)
+    print(f"Optimizing a sum of {terms:,} terms over {distinct} subexpressions")
+    print(f"  AST: {count_nodes(ast):,} nodes, {ast_memory / 1e6:.1f} MB, evaluated in {walk_time:.2f}s")
+    for fold_constants in (False, True):
+        node, optimize_time = timed(optimize, ast, fold_constants)
+        _, walk_time = timed(evaluate, node, True)
+        print(f"  {'folded ' if fold_constants else ''}DAG: {count_nodes(node):,} nodes, optimized in {optimize_time:.2f}s, "
+              f"evaluated in {walk_time:.2f}s")
+
+
+def benchmark_array_ast(terms=200_000):
+    """Compare the memory and the evaluation time of a class-based AST and of an `ArrayAST` of the same expression."""
+    rng = random.Random(0)
+    text = " + ".join(f"{rng.randrange(100)} * ({rng.randrange(100)} - {rng.randrange(100)})" for _ in range(terms))
+    lexer = Lexer(text)
+    ast, ast_time, ast_memory = traced(parse_tokens, PrecedenceParser, lexer)
+    tree, tree_time, tree_memory = traced(parse_tokens, ArrayParser, lexer)
+    value, walk_time = timed(evaluate, ast)
+    tree_value, loop_time = timed(tree.evaluate)
+    assert value == tree_value
+    print(f"AST of {len(tree):,} nodes (parse times measured under tracemalloc)")
+    print(f"  Num/BinOp: {ast_memory / len(tree):.0f} bytes per node, parsed in {ast_time:.2f}s, evaluated in {walk_time:.2f}s")
+    print(f"  ArrayAST: {tree_memory / len(tree):.0f} bytes per node, parsed in {tree_time:.2f}s, evaluated in {loop_time:.2f}s")
+
+
+def balanced_expression(rng, depth):
+    """A random expression whose AST is a complete binary tree of the given depth."""
+    if depth == 0:
+        return str(rng.randrange(100))
+    return f"({balanced_expression(rng, depth - 1)} {rng.choice('+-*/')} {balanced_expression(rng, depth - 1)})"
+
+
+def benchmark_dot(depths=(12, 16)):
+    """Compare `write_dot` with the recursive `graph` methods building a graphviz `Digraph` and its source."""
+    rng = random.Random(0)
+    print("Writing the DOT source of balanced ASTs")
+    for depth in depths:
+        ast = parse_expression(balanced_expression(rng, depth))
+        tree = ArrayParser(Lexer(balanced_expression(rng, depth))).parse()
+
+        def graph():
+            dot = Digraph()
+            ast.graph(dot)
+            return dot.source
+
+        _, graph_time = timed(graph)
+        _, write_time = timed(lambda: write_dot(ast, io.StringIO()))
+        _, array_time = timed(lambda: write_dot(tree, io.StringIO()))
+        _, collapse_time = timed(lambda: write_dot(ast, io.StringIO(), max_depth=8))
+        print(f"  {len(tree):,} nodes: Digraph {graph_time:.2f}s, write_dot {write_time:.2f}s, "
+              f"ArrayAST {array_time:.2f}s, max_depth=8 {collapse_time:.4f}s")
+
+
+def _tokenize_file(mode, path):
+    """Worker task: tokenize a file in one of the modes of `benchmark_file_modes` and return the amount of tokens,
+    the elapsed time in seconds and the peak resident memory of the worker in MB.
+    """
+    start = time.perf_counter()
+    if mode == "idle":
+        count = 0
+    elif mode == "Lexer":
+        with open(path) as file:
+            count = len(Lexer(file.read()).tokens)
+    elif mode == "stream":
+        with open(path) as file:
+            count = sum(1 for _ in tokenize_stream(file))
+    else:
+        buffer = TokenBuffer.from_file(path)
+        count = len(buffer)
+        buffer.close()
+    return count, time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_file_modes(megabytes=16):
+    """Compare reading a whole file into a `Lexer`, streaming it and memory mapping it into a `TokenBuffer`.
+    Every mode runs in a fresh process, so the peak resident memory is its own.
+    """
+    block = random_expression(random.Random(0), 1 << 20)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "expression.txt")
+        with open(path, "w") as file:
+            for _ in range(megabytes):
+                file.write(block)
+        print(f"Tokenizing a {megabytes} MB file, peak resident memory of the process")
+        for mode in ("idle", "Lexer", "stream", "mmap TokenBuffer"):
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                count, elapsed, peak = executor.submit(_tokenize_file, mode, path).result()
+            print(f"  {mode}: {count:,} tokens, {elapsed:.2f}s, {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    benchmark_lexers()
+    benchmark_token_storage()
+    benchmark_parsers()
+    benchmark_evaluation()
+    benchmark_expression_cache()
+    benchmark_optimizer()
+    benchmark_array_ast()
+    benchmark_dot()
+    benchmark_file_modes()
@@ -0,0 +1,260 @@
+import re
+import threading
+from lexer import Lexer, TOKEN_SPECIFICATION, make_token
+from tokenner import Tokenner, TokenType
+
+
+class _ClassTable(dict):
+    """Translation table from code points to character class ids for `str.translate`.
+    Code points are classified on first sight, so the table only holds the characters seen so far.
+    A code point is only stored once its class has a column in every row of the table.
+    """
+    def __init__(self, automaton):
+        super().__init__()
+        self.automaton = automaton
+
+    def __missing__(self, code):
+        with self.automaton.lock:
+            if code not in self:
+                self[code] = self.automaton._classify(chr(code))
+        return self[code]
+
+
+class TokenAutomaton:
+    """Class compiling a token specification into a deterministic finite automaton.
+
+    The specification is a list of (name, regular expression) pairs. The expressions may use literals, escapes
+    such as \\d, \\s or \\+, `.`, character sets, groups, `|`, `*`, `+` and `?`. They are joined into one NFA
+    with Thompson's construction, which is turned into a DFA by the subset construction.
+
+    The alphabet is split into classes of characters matched by the same atoms of the expressions, so the
+    transition table has one column per class instead of one per character. Classes and DFA states are only
+    built for the characters met in the scanned texts, the table is kept between calls. New classes are added
+    under a lock and existing entries are never changed, so threads can share an automaton.
+    """
+    def __init__(self, specification):
+        self.names = [name for name, _ in specification]
+        # atoms[a] is the compiled expression of one character atom, matching a single character
+        self.atoms = []
+        # NFA: edges[q] are the (atom, target) transitions of q and epsilon[q] its ε transitions
+        self.edges = []
+        self.epsilon = []
+        start = self._new_state()
+        # accepts[q] is the index of the token accepted in the NFA state q
+        self.accepts = {}
+        for index, (_, pattern) in enumerate(specification):
+            fragment_start, fragment_end = self._Parser(self, pattern).parse()
+            self.epsilon[start].append(fragment_start)
+            self.accepts.setdefault(fragment_end, index)
+
+        # DFA: state 0 is the dead state and state 1 the start state
+        self.signatures = {}
+        self.class_atoms = []
+        self.subsets = {}
+        self.states = []
+        self.table = []
+        self.accepting = []
+        self._add_state(0)
+        self.start = self._add_state(self._closure(1 << start))
+        self.lock = threading.Lock()
+        self.classes = _ClassTable(self)
+        # Classify latin-1 up front, the other characters are classified when they are first scanned
+        for code in range(256):
+            self.classes[code]
+
+    def _new_state(self):
+        """Method to add an NFA state without transitions and return it."""
+        self.edges.append([])
+        self.epsilon.append([])
+        return len(self.edges) - 1
+
+    def _closure(self, subset):
+        """Method to extend a bitset of NFA states with the states reachable by ε transitions."""
+        stack = [q for q in range(subset.bit_length()) if subset >> q & 1]
+        while stack:
+            for target in self.epsilon[stack.pop()]:
+                if not subset >> target & 1:
+                    subset |= 1 << target
+                    stack.append(target)
+        return subset
+
+    def _add_state(self, subset):
+        """Method to add the DFA state of a bitset of NFA states, together with the states it leads to,
+        and return its number.
+        """
+        if subset in self.subsets:
+            return self.subsets[subset]
+        pending = [subset]
+        self._register(subset)
+        while pending:
+            source = pending.pop()
+            row = self.table[self.subsets[source]]
+            for atoms in self.class_atoms:
+                target = self._move(source, atoms)
+                if target not in self.subsets:
+                    self._register(target)
+                    pending.append(target)
+                row.append(self.subsets[target])
+        return self.subsets[subset]
+
+    def _register(self, subset):
+        """Method to number a bitset of NFA states and give it an empty row."""
+        self.subsets[subset] = len(self.states)
+        self.states.append(subset)
+        self.table.append([])
+        tokens = [self.accepts[q] for q in self.accepts if subset >> q & 1]
+        # The earliest token of the specification wins when several accept the same text
+        self.accepting.append(min(tokens) if tokens else None)
+
+    def _move(self, subset, atoms):
+        """Method to compute the DFA transition from a bitset of NFA states on a class matched by the atoms."""
+        target = 0
+        for q in range(subset.bit_length()):
+            if subset >> q & 1:
+                for atom, next_state in self.edges[q]:
+                    if atoms >> atom & 1:
+                        target |= 1 << next_state
+        return self._closure(target) if target else 0
+
+    def _classify(self, character):
+        """Method to return the class of a character, adding a column to the table for a new class."""
+        atoms = sum(1 << a for a, atom in enumerate(self.atoms) if atom.fullmatch(character))
+        if atoms not in self.signatures:
+            self.signatures[atoms] = len(self.class_atoms)
+            self.class_atoms.append(atoms)
+            for state in range(len(self.states)):
+                self.table[state].append(self._add_state(self._move(self.states[state], atoms)))
+        return self.signatures[atoms]
+
+    def scan(self, text):
+        """Method to split the text into tokens with maximal munch, yielding (name, value) pairs.
+
+        From every position the DFA is run as far as it goes, remembering the last accepting state met, and the
+        longest token found is yielded. Raises a ValueError if no token matches at some position.
+        """
+        classes = text.translate(self.classes)
+        if len(self.class_atoms) <= 256:
+            classes = classes.encode("latin-1")
+        else:
+            classes = [ord(c) for c in classes]
+        table, accepting, names, start = self.table, self.accepting, self.names, self.start
+        n = len(text)
+        position = 0
+        while position < n:
+            state = start
+            token, end = None, position
+            i = position
+            while i < n:
+                state = table[state][classes[i]]
+                if not state:
+                    break
+                i += 1
+                if accepting[state] is not None:
+                    token, end = accepting[state], i
+            if token is None:
+                raise ValueError(f"Unexpected character at position {position}: {text[position]!r}")
+            yield names[token], text[position:end]
+            position = end
+
+    class _Parser:
+        """Recursive descent parser of one expression, building its NFA fragment as a (start, end) pair."""
+        def __init__(self, automaton, pattern):
+            self.automaton = automaton
+            self.pattern = pattern
+            self.pos = 0
+
+        def parse(self):
+            fragment = self.alternation()
+            if self.pos < len(self.pattern):
+                raise ValueError(f"Unbalanced parenthesis at position {self.pos} of {self.pattern!r}")
+            return fragment
+
+        def peek(self):
+            return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+        def alternation(self):
+            branches = [self.sequence()]
+            while self.peek() == "|":
+                self.pos += 1
+                branches.append(self.sequence())
+            if len(branches) == 1:
+                return branches[0]
+            start, end = self.automaton._new_state(), self.automaton._new_state()
+            for branch_start, branch_end in branches:
+                self.automaton.epsilon[start].append(branch_start)
+                self.automaton.epsilon[branch_end].append(end)
+            return start, end
+
+        def sequence(self):
+            start = end = self.automaton._new_state()
+            while self.peek() not in (None, "|", ")"):
+                item_start, item_end = self.repeat()
+                self.automaton.epsilon[end].append(item_start)
+                end = item_end
+            return start, end
+
+        def repeat(self):
+            start, end = self.atom()
+            while self.peek() in ("*", "+", "?"):
+                operator = self.pattern[self.pos]
+                self.pos += 1
+                new_start, new_end = self.automaton._new_state(), self.automaton._new_state()
+                self.automaton.epsilon[new_start].append(start)
+                self.automaton.epsilon[end].append(new_end)
+                if operator in "*?":
+                    self.automaton.epsilon[new_start].append(new_end)
+                if operator in "*+":
+                    self.automaton.epsilon[end].append(start)
+                start, end = new_start, new_end
+            return start, end
+
+        def atom(self):
+            c = self.peek()
+            if c == "(":
+                self.pos += 1
+                if self.pattern.startswith("?:", self.pos):
+                    self.pos += 2
+                fragment = self.alternation()
+                if self.peek() != ")":
+                    raise ValueError(f"Missing ')' in {self.pattern!r}")
+                self.pos += 1
+                return fragment
+            if c in ("*", "+", "?", "{", "^", "$", None):
+                raise ValueError(f"Unsupported {c or 'end'!r} at position {self.pos} of {self.pattern!r}")
+            if c == "[":
+                end = self.pattern.find("]", self.pos + 2 if self.pattern.startswith("[^", self.pos) else self.pos + 1)
+                while end != -1 and self.pattern[end - 1] == "\\":
+                    end = self.pattern.find("]", end + 1)
+                if end == -1:
+                    raise ValueError(f"Missing ']' in {self.pattern!r}")
+                source = self.pattern[self.pos:end + 1]
+            elif c == "\\":
+                source = self.pattern[self.pos:self.pos + 2]
+                if len(source) < 2 or source[1].isdigit() and source[1] != "0" or source[1] in "AbBZ":
+                    raise ValueError(f"Unsupported escape {source!r} in {self.pattern!r}")
+            else:
+                source = c if c == "." else re.escape(c)
+            self.pos += len(source) if c in "[\\" else 1
+            # Every atom gets its own transition, its compiled expression decides the characters it matches
+            atoms = self.automaton.atoms
+            atoms.append(re.compile(source))
+            start, end = self.automaton._new_state(), self.automaton._new_state()
+            self.automaton.edges[start].append((len(atoms) - 1, end))
+            return start, end
+
+
+# The automaton of the lab's token specification, compiled once and shared by every lexer
+TOKEN_AUTOMATON = TokenAutomaton(TOKEN_SPECIFICATION)
+
+
+class DFALexer(Lexer):
+    """Lexer scanning the text with the shared `TOKEN_AUTOMATON` instead of the alternation regex.
+    Produces the same tokens as `Lexer`.
+    """
+    def tokenize(self):
+        """Tokenize the entire input text in one pass over the transition table."""
+        for kind, value in TOKEN_AUTOMATON.scan(self.text):
+            token = make_token(kind, value)
+            if token is not None:
+                self.tokens.append(token)
+        self.tokens.append(Tokenner(TokenType.EOF, None))
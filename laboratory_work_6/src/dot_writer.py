@@ -0,0 +1,72 @@
+import io
+from array_ast import NUM, SYMBOLS, ArrayAST
+from parser_class import Num
+
+# Amount of DOT lines gathered before every write to the file
+LINES_PER_WRITE = 10_000
+
+# Label of the node standing for a subtree that isn't drawn
+COLLAPSED_LABEL = "..."
+
+
+def quote(label):
+    """Return a label as a quoted DOT string."""
+    return '"' + str(label).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def write_dot(root, file, max_depth=None, collapse=None):
+    """Write the DOT source of an AST, class-based or an `ArrayAST`, to a text file object in one pass.
+
+    Nodes are named n0, n1, ... in the order of a preorder walk with an explicit stack, so the output is the same
+    on every run and deep trees don't hit the recursion limit. Operations deeper than `max_depth`, the root
+    being at depth 0, and operations for which `collapse(node)` is true are drawn as one box labeled
+    COLLAPSED_LABEL without walking their subtree. For an `ArrayAST` `collapse` gets the node id.
+    A node shared by several parents in a DAG is drawn once per parent. Returns the amount of nodes written.
+    """
+    if isinstance(root, ArrayAST):
+        tree = root
+
+        def label(i):
+            return tree.value(i) if tree.opcodes[i] == NUM else SYMBOLS[tree.op_type(i)]
+
+        def children(i):
+            return None if tree.opcodes[i] == NUM else (tree.left[i], tree.right[i])
+
+        root = tree.root
+    else:
+        def label(node):
+            return node.value if isinstance(node, Num) else node.op.value
+
+        def children(node):
+            return None if isinstance(node, Num) else (node.left, node.right)
+
+    lines = ["digraph {"]
+    count = 0
+    stack = [(root, None, 0)]
+    while stack:
+        node, parent, depth = stack.pop()
+        name = f"n{count}"
+        count += 1
+        pair = children(node)
+        if pair is not None and (max_depth is not None and depth > max_depth or collapse is not None and collapse(node)):
+            lines.append(f"\t{name} [label={quote(COLLAPSED_LABEL)} shape=box]")
+        else:
+            lines.append(f"\t{name} [label={quote(label(node))}]")
+            if pair is not None:
+                stack.append((pair[1], name, depth + 1))
+                stack.append((pair[0], name, depth + 1))
+        if parent is not None:
+            lines.append(f"\t{parent} -> {name}")
+        if len(lines) >= LINES_PER_WRITE:
+            file.write("\n".join(lines) + "\n")
+            lines.clear()
+    lines.append("}")
+    file.write("\n".join(lines) + "\n")
+    return count
+
+
+def to_dot(root, max_depth=None, collapse=None):
+    """Return the DOT source written by `write_dot` as a string."""
+    buffer = io.StringIO()
+    write_dot(root, buffer, max_depth, collapse)
+    return buffer.getvalue()
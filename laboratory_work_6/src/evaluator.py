@@ -0,0 +1,138 @@
+import operator
+from array import array
+import numpy as np
+from parser_class import Num
+from tokenner import TokenType
+
+
+# Operators in the order of their opcodes, an opcode -k standing for OPERATORS[k - 1]
+OPERATORS = [TokenType.PLUS, TokenType.MINUS, TokenType.MUL, TokenType.DIV]
+OPCODES = {token_type: -k for k, token_type in enumerate(OPERATORS, 1)}
+FUNCTIONS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MUL: operator.mul,
+    TokenType.DIV: operator.truediv,
+}
+# The functions and the NumPy functions of the operators, indexed by the negated opcode
+OPCODE_FUNCTIONS = [None] + [FUNCTIONS[token_type] for token_type in OPERATORS]
+OPCODE_UFUNCS = [None, np.add, np.subtract, np.multiply, np.divide]
+
+
+def postorder(node):
+    """Yield the nodes of an AST with the children before their parent, without recursion."""
+    stack = [(node, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited or isinstance(node, Num):
+            yield node
+        else:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+
+
+def unique_postorder(node):
+    """Yield the distinct nodes of an AST or of a DAG made by `optimizer.optimize` like `postorder`, a node shared
+    by several parents being yielded, and walked, only once.
+    """
+    seen = set()
+    stack = [(node, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited or isinstance(node, Num):
+            if id(node) not in seen:
+                seen.add(id(node))
+                yield node
+        elif id(node) not in seen:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+
+
+def evaluate(node, shared=False):
+    """Compute the value of an AST by walking it, `/` being the true division.
+    With `shared`, the value of every distinct node is computed once, which is faster for DAGs with shared nodes
+    and slower for plain trees.
+    """
+    if shared:
+        values = {}
+        for node in unique_postorder(node):
+            if isinstance(node, Num):
+                values[id(node)] = node.value
+            else:
+                values[id(node)] = FUNCTIONS[node.op.type](values[id(node.left)], values[id(node.right)])
+        return values[id(node)]
+    values = []
+    for node in postorder(node):
+        if isinstance(node, Num):
+            values.append(node.value)
+        else:
+            right = values.pop()
+            values[-1] = FUNCTIONS[node.op.type](values[-1], right)
+    return values[0]
+
+
+class Program:
+    """Class holding an AST compiled to postfix code for a stack machine.
+
+    The code is an array of signed integers: a value k >= 0 pushes the k-th constant and a negative value
+    applies the operator of its opcode to the two values on top of the stack. The constants are the numbers of
+    the expression from left to right, and can be replaced when running it, so one program evaluates the same
+    expression over other numbers.
+    """
+    def __init__(self, code, constants):
+        self.code = code
+        self.constants = constants
+
+    def __str__(self):
+        """String representation of the class instance."""
+        return f"Program({len(self.code)} instructions, {len(self.constants)} constants)"
+
+    def __repr__(self):
+        """String representation of the class instance."""
+        return self.__str__()
+
+    def run(self, constants=None):
+        """Method to run the code on the constants of the expression, or on other ones."""
+        constants = self.constants if constants is None else constants
+        functions = OPCODE_FUNCTIONS
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for instruction in self.code:
+            if instruction >= 0:
+                push(constants[instruction])
+            else:
+                right = pop()
+                stack[-1] = functions[-instruction](stack[-1], right)
+        return stack[0]
+
+    def run_batch(self, constants):
+        """Method to run the code once for every row of a 2D array of constants, with NumPy operations on columns.
+        Returns the array of the results, divisions by zero giving inf or nan instead of raising.
+        """
+        columns = np.asarray(constants, dtype=np.float64).T
+        functions = OPCODE_UFUNCS
+        stack = []
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for instruction in self.code:
+                if instruction >= 0:
+                    stack.append(columns[instruction])
+                else:
+                    right = stack.pop()
+                    stack[-1] = functions[-instruction](stack[-1], right)
+        return np.array(stack[0])
+
+
+def compile_ast(node) -> Program:
+    """Compile an AST to a `Program`."""
+    code = array("q")
+    constants = []
+    for node in postorder(node):
+        if isinstance(node, Num):
+            code.append(len(constants))
+            constants.append(node.value)
+        else:
+            code.append(OPCODES[node.op.type])
+    return Program(code, constants)
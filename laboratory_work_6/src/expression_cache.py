@@ -0,0 +1,97 @@
+import re
+import threading
+from collections import OrderedDict
+from evaluator import compile_ast
+from lexer import Lexer
+from parser_class import PrecedenceParser
+
+
+# Whitespace between two digits separates two integers, any other whitespace can be dropped
+WHITESPACE = re.compile(r'(?<=\d)(\s+)(?=\d)|\s+')
+
+
+def normalize(text):
+    """Return the text without whitespace, except for one space between digits, so texts differing only by
+    whitespace get the same key.
+    """
+    return WHITESPACE.sub(lambda mo: ' ' if mo.group(1) else '', text)
+
+
+def parse_expression(text):
+    """Return the AST of an expression."""
+    return PrecedenceParser(Lexer(text)).parse()
+
+
+def compile_expression(text):
+    """Return the compiled `Program` of an expression."""
+    return compile_ast(parse_expression(text))
+
+
+class ExpressionCache:
+    """Class keeping the parsed form of the most recently used expressions, keyed by their normalized text.
+
+    `build` turns a text into what is cached, `parse_expression` by default or `compile_expression` for programs.
+    At most `maxsize` entries are kept, evicting the least recently used one, and texts longer than `max_length`
+    are built without being cached. Cached values are shared, so they must not be modified.
+
+    The cache can be shared between threads: its dictionary and statistics are only used under a lock, while
+    building runs outside of it, so two threads missing the same text at once both build it.
+    """
+    def __init__(self, maxsize=1024, max_length=None, build=parse_expression):
+        if maxsize < 1:
+            raise ValueError("The cache must hold at least one entry")
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self.build = build
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __str__(self):
+        """String representation of the class instance."""
+        return f"ExpressionCache({len(self.entries)}/{self.maxsize} entries, {self.hits} hits, {self.misses} misses)"
+
+    def __repr__(self):
+        """String representation of the class instance."""
+        return self.__str__()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, text):
+        """Return the cached value of the text, building it on a miss."""
+        key = normalize(text)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        value = self.build(key)
+        if self.max_length is None or len(key) <= self.max_length:
+            with self.lock:
+                self.entries[key] = value
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def info(self):
+        """Return the statistics of the cache."""
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        """Remove every entry and reset the statistics."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
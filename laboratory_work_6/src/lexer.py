@@ -1,6 +1,87 @@
 import re
 from tokenner import Tokenner, TokenType
 
+
+# Token names and regular expressions, tried in order
+TOKEN_SPECIFICATION = [
+    ('INTEGER',   r'\d+'),            # Integer
+    ('PLUS',      r'\+'),             # Plus sign
+    ('MINUS',     r'-'),              # Minus sign
+    ('MUL',       r'\*'),             # Multiplication sign
+    ('DIV',       r'\/'),             # Division sign
+    ('LPAREN',    r'\('),             # Left Parenthesis
+    ('RPAREN',    r'\)'),             # Right Parenthesis
+    ('WHITESPACE', r'\s+'),           # Whitespace
+    ('UNKNOWN',   r'.'),              # Any other character
+]
+
+# The alternation of the whole specification, compiled once
+TOKEN_REGEX = re.compile('|'.join('(?P<%s>%s)' % pair for pair in TOKEN_SPECIFICATION))
+
+# The same alternation over bytes, for memory-mapped files, where \d and \s only match ASCII characters
+BYTE_TOKEN_REGEX = re.compile(TOKEN_REGEX.pattern.encode())
+
+# Amount of characters read from a file object at a time by `tokenize_stream`
+CHUNK_SIZE = 1 << 16
+
+
+def make_token(kind, value):
+    """Return the token of a matched text, or None for whitespace."""
+    if kind == 'WHITESPACE':
+        return None
+    elif kind == 'INTEGER':
+        value = int(value)
+    elif kind == 'UNKNOWN':
+        raise Exception(f'Unexpected character: {value}')
+    return Tokenner(TokenType[kind], value)
+
+
+def read_chunks(source, chunk_size=CHUNK_SIZE):
+    """Yield the text of a file object `chunk_size` characters at a time, or the strings of an iterable as they are."""
+    if hasattr(source, 'read'):
+        while chunk := source.read(chunk_size):
+            yield chunk
+    else:
+        yield from source
+
+
+def tokenize_stream(source, chunk_size=CHUNK_SIZE):
+    """Lazily tokenize a file object or an iterable of strings, ending with an EOF token.
+
+    A match reaching the end of the text read so far may go on in the next chunk, like the digits of an integer,
+    so it is kept and matched again with the following chunks. It is only matched again once the chunks read
+    after it are at least as long as it, so a token spanning many chunks is scanned a logarithmic number of times
+    and every character is scanned a constant number of times overall. Only that unfinished token and the chunks
+    read after it are held in memory.
+    """
+    rest = ''
+    # Chunks read since the last scan and their total length
+    pending = []
+    size = 0
+    for chunk in read_chunks(source, chunk_size):
+        pending.append(chunk)
+        size += len(chunk)
+        if size < len(rest):
+            continue
+        text = rest + ''.join(pending)
+        pending.clear()
+        size = 0
+        start = 0
+        for mo in TOKEN_REGEX.finditer(text):
+            if mo.end() == len(text):
+                break
+            start = mo.end()
+            token = make_token(mo.lastgroup, mo.group())
+            if token is not None:
+                yield token
+        rest = text[start:]
+    for mo in TOKEN_REGEX.finditer(rest + ''.join(pending)):
+        token = make_token(mo.lastgroup, mo.group())
+        if token is not None:
+            yield token
+    yield Tokenner(TokenType.EOF, None)
+
+
 class Lexer:
     def __init__(self, text):
         self.text = text
@@ -18,28 +99,10 @@ class Lexer:
 
     def tokenize(self):
         """Tokenize the entire input text using regular expressions."""
-        token_specification = [
-            ('INTEGER',   r'\d+'),            # Integer
-            ('PLUS',      r'\+'),             # Plus sign
-            ('MINUS',     r'-'),              # Minus sign
-            ('MUL',       r'\*'),             # Multiplication sign
-            ('DIV',       r'\/'),             # Division sign
-            ('LPAREN',    r'\('),             # Left Parenthesis
-            ('RPAREN',    r'\)'),             # Right Parenthesis
-            ('WHITESPACE', r'\s+'),           # Whitespace
-            ('UNKNOWN',   r'.'),              # Any other character
-        ]
-        tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in token_specification)
-        for mo in re.finditer(tok_regex, self.text):
-            kind = mo.lastgroup
-            value = mo.group()
-            if kind == 'WHITESPACE':
-                continue
-            elif kind == 'INTEGER':
-                value = int(value)
-            elif kind == 'UNKNOWN':
-                raise Exception(f'Unexpected character: {value}')
-            self.tokens.append(Tokenner(TokenType[kind], value))
+        for mo in TOKEN_REGEX.finditer(self.text):
+            token = make_token(mo.lastgroup, mo.group())
+            if token is not None:
+                self.tokens.append(token)
         self.tokens.append(Tokenner(TokenType.EOF, None))
 
     def get_next_token(self):
@@ -51,6 +114,24 @@ class Lexer:
         else:
             return Tokenner(TokenType.EOF, None)
 
-# Example usage
-lexer = Lexer("3 + 4 * (2 - 1) / 2")
-print(lexer.tokens)
\ No newline at end of file
+
+class StreamLexer:
+    """Lexer reading its tokens lazily from a file object or an iterable of strings with `tokenize_stream`.
+    It can be given to the `Parser` in place of a `Lexer`.
+    """
+    def __init__(self, source, chunk_size=CHUNK_SIZE):
+        self.tokens = tokenize_stream(source, chunk_size)
+
+    def __iter__(self):
+        """Iterate over the remaining tokens, ending with the EOF token."""
+        return self.tokens
+
+    def get_next_token(self):
+        """Return the next token read from the source."""
+        return next(self.tokens, Tokenner(TokenType.EOF, None))
+
+
+if __name__ == "__main__":
+    # Example usage
+    lexer = Lexer("3 + 4 * (2 - 1) / 2")
+    print(lexer.tokens)
\ No newline at end of file
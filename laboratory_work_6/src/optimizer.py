@@ -0,0 +1,74 @@
+from evaluator import FUNCTIONS
+from parser_class import BinOp, Num
+from tokenner import Tokenner, TokenType
+
+
+def fold(op, left, right):
+    """Return the value of a binary operation on two numbers, or None when it shouldn't be folded.
+    Divisions are only folded when they are exact and give an integer, so every number stays an integer.
+    """
+    if op.type == TokenType.DIV:
+        if right == 0 or left % right:
+            return None
+        return left // right
+    return FUNCTIONS[op.type](left, right)
+
+
+def optimize(node, fold_constants=True):
+    """Return an optimized copy of an AST, as a DAG where structurally identical subtrees are one shared node.
+
+    Nodes are rebuilt from the leaves up and looked up in a table keyed by their number, or by their operator and
+    the already shared children, so every distinct subtree is built once. With `fold_constants`, operations on two
+    numbers are replaced by their result. The original AST is not modified, nodes of it are reused when nothing
+    below them changes. Shared nodes must not be modified.
+    """
+    # table maps a key to its shared node, shared maps the id of an original node to its shared node
+    table = {}
+    shared = {}
+    # A post-order walk skipping the nodes already shared, so DAGs are walked in their own size
+    stack = [(node, False)]
+    while stack:
+        original, visited = stack.pop()
+        if id(original) in shared:
+            continue
+        if isinstance(original, BinOp) and not visited:
+            stack.append((original, True))
+            stack.append((original.right, False))
+            stack.append((original.left, False))
+            continue
+        if isinstance(original, Num):
+            result = table.setdefault((TokenType.INTEGER, original.value), original)
+        else:
+            left, right = shared[id(original.left)], shared[id(original.right)]
+            value = None
+            if fold_constants and isinstance(left, Num) and isinstance(right, Num):
+                value = fold(original.op, left.value, right.value)
+            if value is not None:
+                key = (TokenType.INTEGER, value)
+                if key not in table:
+                    table[key] = Num(Tokenner(TokenType.INTEGER, value))
+                result = table[key]
+            else:
+                key = (original.op.type, id(left), id(right))
+                if key not in table:
+                    if left is original.left and right is original.right:
+                        table[key] = original
+                    else:
+                        table[key] = BinOp(left=left, op=original.op, right=right)
+                result = table[key]
+        shared[id(original)] = result
+    return shared[id(node)]
+
+
+def count_nodes(node):
+    """Count the distinct nodes of an AST or of a DAG made by `optimize`."""
+    seen = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if id(node) not in seen:
+            seen.add(id(node))
+            if isinstance(node, BinOp):
+                stack.append(node.left)
+                stack.append(node.right)
+    return len(seen)
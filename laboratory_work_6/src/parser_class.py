@@ -95,3 +95,76 @@ class Parser:
     def parse(self):
         """Parse the input text."""
         return self.expr()
+
+
+# Binding strength of the binary operators, all of them being left associative
+PRECEDENCE = {
+    TokenType.PLUS: 1,
+    TokenType.MINUS: 1,
+    TokenType.MUL: 2,
+    TokenType.DIV: 2,
+}
+
+
+class PrecedenceParser(Parser):
+    """Parser building the same AST as `Parser` with the shunting-yard algorithm and explicit stacks.
+
+    There is no recursion, so the nesting depth is only limited by memory, and every token is handled once
+    instead of going through a call per grammar level. Like `Parser`, it stops at the first token that can't
+    continue the expression, but it raises on a missing operand where `Parser` returns None.
+    Nodes are made by the `num` and `binop` methods, which subclasses can override to build other representations.
+    """
+    def num(self, token):
+        """Make the node of a number."""
+        return Num(token)
+
+    def binop(self, left, op, right):
+        """Make the node of a binary operation."""
+        return BinOp(left=left, op=op, right=right)
+
+    def parse(self):
+        """Parse the input text."""
+        INTEGER, LPAREN, RPAREN = TokenType.INTEGER, TokenType.LPAREN, TokenType.RPAREN
+        next_token = self.lexer.get_next_token
+        num, binop = self.num, self.binop
+        operands = []
+        # Operators waiting for their right operand, with their precedence, left parentheses having 0
+        operators = []
+        open_parens = 0
+        token = self.current_token
+        while True:
+            # An operand, after any amount of opening parentheses
+            while token.type == LPAREN:
+                operators.append((token, 0))
+                open_parens += 1
+                token = next_token()
+            if token.type != INTEGER:
+                self.current_token = token
+                self.error()
+            operands.append(num(token))
+            token = next_token()
+            # Closing parentheses, then an operator or the end of the expression
+            while True:
+                if token.type in PRECEDENCE:
+                    precedence = PRECEDENCE[token.type]
+                    while operators and operators[-1][1] >= precedence:
+                        right = operands.pop()
+                        operands[-1] = binop(operands[-1], operators.pop()[0], right)
+                    operators.append((token, precedence))
+                    token = next_token()
+                    break
+                elif token.type == RPAREN and open_parens:
+                    while operators[-1][1]:
+                        right = operands.pop()
+                        operands[-1] = binop(operands[-1], operators.pop()[0], right)
+                    operators.pop()
+                    open_parens -= 1
+                    token = next_token()
+                else:
+                    self.current_token = token
+                    if open_parens:
+                        self.error()
+                    while operators:
+                        right = operands.pop()
+                        operands[-1] = binop(operands[-1], operators.pop()[0], right)
+                    return operands[0]
@@ -0,0 +1,63 @@
+import random
+import unittest
+from array_ast import ArrayAST, ArrayParser
+from evaluator import evaluate
+from lexer import Lexer
+from optimizer import count_nodes, optimize
+from parser_class import Parser
+from test_parser_class import as_tuple, random_expression
+from tokenner import TokenType
+
+
+class TestArrayAST(unittest.TestCase):
+    def test_parser(self):
+        """Test of the array parser building the AST of the recursive parser."""
+        rng = random.Random(0)
+        for _ in range(200):
+            text = random_expression(rng, 4)
+            tree = ArrayParser(Lexer(text)).parse()
+            self.assertEqual(as_tuple(tree.to_ast()), as_tuple(Parser(Lexer(text)).parse()), text)
+            self.assertEqual(len(tree), count_nodes(Parser(Lexer(text)).parse()))
+
+    def test_arrays(self):
+        """Test of the arrays of a small tree."""
+        tree = ArrayParser(Lexer("(1 + 2) * 3")).parse()
+        self.assertEqual(list(tree.opcodes), [0, 0, -1, 0, -3])
+        self.assertEqual(list(tree.left), [-1, -1, 0, -1, 2])
+        self.assertEqual(list(tree.right), [-1, -1, 1, -1, 3])
+        self.assertEqual(list(tree.values), [1, 2, 0, 3, 0])
+        self.assertEqual(tree.root, 4)
+        self.assertEqual(tree.evaluate(), 9)
+        self.assertEqual(tree.evaluate(2), 3)
+
+    def test_builder(self):
+        """Test of building a tree node by node, with a number larger than 64 bits."""
+        tree = ArrayAST()
+        big = tree.add_num(1 << 70)
+        tree.root = tree.add_binop(TokenType.DIV, big, tree.add_num(1 << 6))
+        self.assertEqual(tree.evaluate(), 1 << 64)
+        self.assertEqual(as_tuple(tree.to_ast()), (1 << 70, "/", 64))
+
+    def test_round_trip(self):
+        """Test of converting class-based ASTs and DAGs to arrays and back."""
+        ast = Parser(Lexer("(3 + 1) * (3 + 1) - (3 + 1) / 3")).parse()
+        tree = ArrayAST.from_ast(ast)
+        self.assertEqual(len(tree), 13)
+        self.assertEqual(as_tuple(tree.to_ast()), as_tuple(ast))
+        dag = ArrayAST.from_ast(optimize(ast, fold_constants=False))
+        self.assertEqual(len(dag), 6)
+        node = dag.to_ast()
+        self.assertIs(node.left.left, node.left.right)
+        self.assertEqual(dag.evaluate(), evaluate(ast))
+
+    def test_deep_expression(self):
+        """Test of a tree nested 100000 levels deep."""
+        depth = 100_000
+        tree = ArrayParser(Lexer("1 - (" * depth + "2" + ")" * depth)).parse()
+        self.assertEqual(len(tree), 2 * depth + 1)
+        self.assertEqual(tree.evaluate(), 2)
+        self.assertEqual(ArrayAST.from_ast(tree.to_ast()).evaluate(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import random
+import threading
+import unittest
+from dfa_lexer import DFALexer, TokenAutomaton
+from lexer import Lexer
+from tokenner import Tokenner, TokenType
+
+
+class TestDFALexer(unittest.TestCase):
+    def test_same_tokens_as_lexer(self):
+        """Test of the DFA lexer giving the tokens of the regex lexer."""
+        rng = random.Random(0)
+        for _ in range(50):
+            text = "".join(rng.choice(["12", "7", "+", "-", "*", "/", "(", ")", " ", "\t", "\n", "345"]) for _ in range(40))
+            self.assertEqual(DFALexer(text).tokens, Lexer(text).tokens)
+
+    def test_expression(self):
+        """Test of tokenizing an expression."""
+        self.assertEqual(DFALexer("12*(3 - 45)").tokens, [
+            Tokenner(TokenType.INTEGER, 12), Tokenner(TokenType.MUL, "*"), Tokenner(TokenType.LPAREN, "("),
+            Tokenner(TokenType.INTEGER, 3), Tokenner(TokenType.MINUS, "-"), Tokenner(TokenType.INTEGER, 45),
+            Tokenner(TokenType.RPAREN, ")"), Tokenner(TokenType.EOF, None),
+        ])
+
+    def test_unknown_character(self):
+        """Test of the exception raised on an unknown character."""
+        with self.assertRaises(Exception):
+            DFALexer("1 + x")
+        with self.assertRaises(Exception):
+            DFALexer("1 + é")
+
+    def test_maximal_munch(self):
+        """Test of the longest token winning and of earlier tokens winning ties."""
+        automaton = TokenAutomaton([
+            ("IF", r"if"),
+            ("NAME", r"[a-z]\w*"),
+            ("NUMBER", r"\d+(\.\d+)?"),
+            ("OPERATOR", r"==|=|<=?"),
+            ("WHITESPACE", r"\s+"),
+        ])
+        self.assertEqual(list(automaton.scan("if iffy 3.14 x<=4==5")), [
+            ("IF", "if"), ("WHITESPACE", " "), ("NAME", "iffy"), ("WHITESPACE", " "), ("NUMBER", "3.14"),
+            ("WHITESPACE", " "), ("NAME", "x"), ("OPERATOR", "<="), ("NUMBER", "4"), ("OPERATOR", "=="),
+            ("NUMBER", "5"),
+        ])
+        # "3." falls back to the last accepted token, the lone dot matches nothing
+        with self.assertRaises(ValueError):
+            list(automaton.scan("3."))
+
+    def test_threads_sharing_an_automaton(self):
+        """Test of threads scanning texts with new character classes through one automaton."""
+        specification = [
+            ("GREEK", r"[α-ω]+"),
+            ("CYRILLIC", r"[а-я]+"),
+            ("HAN", r"[一-龥]+"),
+            ("WHITESPACE", r"\s+"),
+            ("OTHER", r"."),
+        ]
+        rng = random.Random(0)
+        alphabet = "αβγωабвя一二龥 ÿĀ€"
+        texts = ["".join(rng.choice(alphabet) for _ in range(200)) for _ in range(32)]
+        expected = [list(TokenAutomaton(specification).scan(text)) for text in texts]
+
+        automaton = TokenAutomaton(specification)
+        results = [None] * len(texts)
+        barrier = threading.Barrier(len(texts))
+
+        def scan(i):
+            barrier.wait()
+            results[i] = list(automaton.scan(texts[i]))
+
+        threads = [threading.Thread(target=scan, args=(i,)) for i in range(len(texts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, expected)
+
+    def test_unsupported_expression(self):
+        """Test of the ValueError raised for expressions outside the supported syntax."""
+        for pattern in (r"a{2}", r"(a", r"a)", r"^a", r"*"):
+            with self.assertRaises(ValueError):
+                TokenAutomaton([("A", pattern)])
+
+
+if __name__ == "__main__":
+    unittest.main()
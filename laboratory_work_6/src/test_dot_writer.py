@@ -0,0 +1,54 @@
+import io
+import unittest
+from array_ast import ArrayAST, ArrayParser
+from dot_writer import to_dot, write_dot
+from lexer import Lexer
+from parser_class import BinOp, Parser, PrecedenceParser
+
+
+class TestDotWriter(unittest.TestCase):
+    def test_dot(self):
+        """Test of the DOT source of a small AST."""
+        ast = Parser(Lexer("1 + 2 * 3")).parse()
+        self.assertEqual(to_dot(ast), "digraph {\n"
+                                      "\tn0 [label=\"+\"]\n"
+                                      "\tn1 [label=\"1\"]\n"
+                                      "\tn0 -> n1\n"
+                                      "\tn2 [label=\"*\"]\n"
+                                      "\tn0 -> n2\n"
+                                      "\tn3 [label=\"2\"]\n"
+                                      "\tn2 -> n3\n"
+                                      "\tn4 [label=\"3\"]\n"
+                                      "\tn2 -> n4\n"
+                                      "}\n")
+
+    def test_deterministic(self):
+        """Test of the output not depending on the objects or on the AST representation."""
+        text = "723 + 3 * (120 / (12 / (3 + 1) - 1))"
+        first = to_dot(Parser(Lexer(text)).parse())
+        self.assertEqual(to_dot(Parser(Lexer(text)).parse()), first)
+        self.assertEqual(to_dot(ArrayParser(Lexer(text)).parse()), first)
+
+    def test_max_depth_and_collapse(self):
+        """Test of drawing subtrees as one node."""
+        ast = Parser(Lexer("(1 + 2) * (3 - 4)")).parse()
+        dot = to_dot(ast, max_depth=0)
+        self.assertEqual(dot.count("label="), 3)
+        self.assertEqual(dot.count("shape=box"), 2)
+        dot = to_dot(ast, collapse=lambda node: isinstance(node, BinOp) and node.op.value == "-")
+        self.assertEqual(dot.count("label="), 5)
+        self.assertIn("n4 [label=\"...\" shape=box]", dot)
+        tree = ArrayAST.from_ast(ast)
+        self.assertEqual(to_dot(tree, collapse=lambda i: tree.opcodes[i] == -2), dot)
+
+    def test_deep_expression(self):
+        """Test of writing an AST nested 100000 levels deep to a file."""
+        depth = 100_000
+        ast = PrecedenceParser(Lexer("1 - (" * depth + "2" + ")" * depth)).parse()
+        file = io.StringIO()
+        self.assertEqual(write_dot(ast, file), 2 * depth + 1)
+        self.assertEqual(file.getvalue().count("->"), 2 * depth)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+import numpy as np
+from evaluator import compile_ast, evaluate
+from lexer import Lexer
+from parser_class import Parser, PrecedenceParser
+from test_parser_class import random_expression
+
+
+class TestEvaluator(unittest.TestCase):
+    def test_evaluate(self):
+        """Test of evaluating expressions."""
+        self.assertEqual(evaluate(Parser(Lexer("723 + 3 * (120 / (12 / (3 + 1) - 1))")).parse()), 903)
+        self.assertEqual(evaluate(Parser(Lexer("8 - 4 - 2")).parse()), 2)
+        self.assertEqual(evaluate(Parser(Lexer("7")).parse()), 7)
+
+    def test_same_value_as_python(self):
+        """Test of the evaluator and the compiled program giving the value computed by Python."""
+        rng = random.Random(0)
+        for _ in range(200):
+            text = random_expression(rng, 4)
+            try:
+                expected = eval(text)
+            except ZeroDivisionError:
+                continue
+            ast = Parser(Lexer(text)).parse()
+            self.assertAlmostEqual(evaluate(ast), expected)
+            self.assertAlmostEqual(compile_ast(ast).run(), expected)
+
+    def test_division_by_zero(self):
+        """Test of the exception raised on a division by zero."""
+        ast = Parser(Lexer("1 / (2 - 2)")).parse()
+        with self.assertRaises(ZeroDivisionError):
+            evaluate(ast)
+        with self.assertRaises(ZeroDivisionError):
+            compile_ast(ast).run()
+
+    def test_program(self):
+        """Test of the postfix code and of running it on other constants."""
+        program = compile_ast(Parser(Lexer("(1 + 2) * 3")).parse())
+        self.assertEqual(list(program.code), [0, 1, -1, 2, -3])
+        self.assertEqual(program.constants, [1, 2, 3])
+        self.assertEqual(program.run(), 9)
+        self.assertEqual(program.run([4, 5, 6]), 54)
+
+    def test_run_batch(self):
+        """Test of running a program over rows of constants with NumPy."""
+        program = compile_ast(Parser(Lexer("10 / (1 - 2) + 3")).parse())
+        rows = np.array([[10, 1, 2, 3], [6, 4, 1, 0], [1, 1, 1, 0]])
+        results = program.run_batch(rows)
+        np.testing.assert_allclose(results[:2], [program.run(list(row)) for row in rows[:2]])
+        self.assertEqual(results[2], np.inf)
+
+    def test_deep_expression(self):
+        """Test of evaluating and compiling an AST nested 100000 levels deep."""
+        depth = 100_000
+        ast = PrecedenceParser(Lexer("1 - (" * depth + "2" + ")" * depth)).parse()
+        # 1 - (1 - x) = x, so every two levels cancel out
+        self.assertEqual(evaluate(ast), 2)
+        self.assertEqual(compile_ast(ast).run(), evaluate(ast))
+
+
+if __name__ == "__main__":
+    unittest.main()
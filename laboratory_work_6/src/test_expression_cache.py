@@ -0,0 +1,72 @@
+import threading
+import unittest
+from evaluator import evaluate
+from expression_cache import ExpressionCache, compile_expression, normalize
+
+
+class TestExpressionCache(unittest.TestCase):
+    def test_normalize(self):
+        """Test of whitespace normalization keeping integers apart."""
+        self.assertEqual(normalize(" 3 +\t4 * ( 2 - 1 )\n"), "3+4*(2-1)")
+        self.assertEqual(normalize("12  34 +5"), "12 34+5")
+
+    def test_hits_and_misses(self):
+        """Test of texts differing by whitespace sharing an entry."""
+        cache = ExpressionCache()
+        ast = cache.get("3 + 4 * 2")
+        self.assertIs(cache.get("3+4*2"), ast)
+        self.assertIs(cache.get(" 3 +  4*2 "), ast)
+        self.assertEqual(evaluate(ast), 11)
+        self.assertEqual(cache.info(), {"hits": 2, "misses": 1, "evictions": 0, "size": 1, "maxsize": 1024})
+
+    def test_lru_eviction(self):
+        """Test of the least recently used entry being evicted."""
+        cache = ExpressionCache(maxsize=2)
+        first = cache.get("1 + 1")
+        cache.get("2 + 2")
+        cache.get("1+1")
+        cache.get("3 + 3")
+        self.assertIs(cache.get("1 + 1"), first)
+        self.assertEqual(list(cache.entries), ["3+3", "1+1"])
+        self.assertEqual(cache.info()["evictions"], 1)
+
+    def test_max_length(self):
+        """Test of long texts not being cached."""
+        cache = ExpressionCache(max_length=4)
+        cache.get("1 + 2 + 3")
+        cache.get("1 + 2")
+        self.assertEqual(list(cache.entries), ["1+2"])
+
+    def test_compile(self):
+        """Test of caching compiled programs."""
+        cache = ExpressionCache(build=compile_expression)
+        self.assertEqual(cache.get("(1 + 2) * 3").run(), 9)
+        self.assertIs(cache.get("(1+2)*3"), cache.get("(1 + 2)*3"))
+
+    def test_threads(self):
+        """Test of sharing a cache between threads."""
+        cache = ExpressionCache(maxsize=8)
+        texts = [f"{i} * (2 + {i})" for i in range(16)]
+        errors = []
+
+        def work():
+            try:
+                for _ in range(50):
+                    for i, text in enumerate(texts):
+                        self.assertEqual(evaluate(cache.get(text)), i * (2 + i))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        info = cache.info()
+        self.assertEqual(info["hits"] + info["misses"], 4 * 50 * 16)
+        self.assertLessEqual(info["size"], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
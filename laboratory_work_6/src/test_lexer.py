@@ -0,0 +1,56 @@
+import io
+import itertools
+import random
+import tracemalloc
+import unittest
+from lexer import Lexer, StreamLexer, tokenize_stream
+from parser_class import Parser
+from tokenner import Tokenner, TokenType
+
+
+class TestStreamLexer(unittest.TestCase):
+    def test_chunk_boundaries(self):
+        """Test of tokens crossing chunk boundaries, for every chunk size."""
+        text = "723 + 3 * (120 / (12 / (3 + 1) - 1))\n  4500 -6"
+        for chunk_size in range(1, len(text) + 1):
+            chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+            self.assertEqual(list(tokenize_stream(chunks)), Lexer(text).tokens)
+
+    def test_file_object(self):
+        """Test of tokenizing a file object read in chunks."""
+        rng = random.Random(0)
+        text = "".join(rng.choice(["12", "7", "+", "-", "*", "/", "(", ")", " ", "\n", "345"]) for _ in range(1000))
+        self.assertEqual(list(tokenize_stream(io.StringIO(text), chunk_size=5)), Lexer(text).tokens)
+
+    def test_unknown_character(self):
+        """Test of the exception raised on an unknown character."""
+        with self.assertRaises(Exception):
+            list(tokenize_stream(["1 +", " x"]))
+
+    def test_long_token_over_many_chunks(self):
+        """Test of a token spanning many small chunks, which is only matched again after the stream has doubled."""
+        chunks = itertools.chain(itertools.repeat(" ", 500_000), ["12", " ", "+"] * 10, itertools.repeat("\t", 500_000), ["3"])
+        self.assertEqual(list(tokenize_stream(chunks)), Lexer(" 12 +" * 10 + " 3").tokens)
+
+    def test_parser(self):
+        """Test of parsing the tokens of a stream lexer."""
+        lexer = StreamLexer(["3 * (1", "2 + 4)"])
+        ast = Parser(lexer).parse()
+        self.assertEqual(ast.op, Tokenner(TokenType.MUL, "*"))
+        self.assertEqual(ast.right.left.value, 12)
+        self.assertEqual(lexer.get_next_token(), Tokenner(TokenType.EOF, None))
+
+    def test_constant_memory(self):
+        """Test of the memory used by a long stream staying bounded."""
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in tokenize_stream(itertools.repeat("123 + 45 * ", 20_000)))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(count, 80_001)
+        self.assertLess(peak, 100_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
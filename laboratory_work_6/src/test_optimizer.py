@@ -0,0 +1,58 @@
+import random
+import unittest
+from evaluator import evaluate
+from lexer import Lexer
+from optimizer import count_nodes, optimize
+from parser_class import BinOp, Num, Parser, PrecedenceParser
+from test_parser_class import as_tuple, random_expression
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_constant_folding(self):
+        """Test of folding operations on numbers, divisions only when exact."""
+        node = optimize(Parser(Lexer("723 + 3 * (120 / (12 / (3 + 1) - 1))")).parse())
+        self.assertIsInstance(node, Num)
+        self.assertEqual(node.value, 903)
+        node = optimize(Parser(Lexer("2 * 3 + 7 / (4 - 2)")).parse())
+        self.assertEqual(as_tuple(node), (6, "+", (7, "/", 2)))
+        node = optimize(Parser(Lexer("1 / (2 - 2)")).parse())
+        self.assertEqual(as_tuple(node), (1, "/", 0))
+
+    def test_shared_subtrees(self):
+        """Test of identical subtrees becoming one node."""
+        ast = Parser(Lexer("(3 + 1) * (3 + 1) - (3 + 1) / 3")).parse()
+        node = optimize(ast, fold_constants=False)
+        self.assertIs(node.left.left, node.left.right)
+        self.assertIs(node.left.left, node.right.left)
+        self.assertIs(node.left.left.left, node.right.right)
+        self.assertEqual(as_tuple(node), as_tuple(ast))
+        self.assertEqual((count_nodes(ast), count_nodes(node)), (13, 6))
+
+    def test_same_value(self):
+        """Test of the optimized AST having the value of the original one, which is left unchanged."""
+        rng = random.Random(0)
+        for _ in range(200):
+            text = random_expression(rng, 4)
+            ast = Parser(Lexer(text)).parse()
+            before = as_tuple(ast)
+            try:
+                expected = evaluate(ast)
+            except ZeroDivisionError:
+                continue
+            self.assertAlmostEqual(evaluate(optimize(ast)), expected)
+            self.assertAlmostEqual(evaluate(optimize(ast, fold_constants=False)), expected)
+            self.assertAlmostEqual(evaluate(optimize(ast, fold_constants=False), shared=True), expected)
+            self.assertEqual(as_tuple(ast), before)
+
+    def test_deep_expression(self):
+        """Test of optimizing an AST nested 100000 levels deep."""
+        depth = 100_000
+        ast = PrecedenceParser(Lexer("1 - (" * depth + "2" + ")" * depth)).parse()
+        self.assertEqual(optimize(ast).value, 2)
+        self.assertEqual(count_nodes(optimize(ast, fold_constants=False)), depth + 2)
+        ast = PrecedenceParser(Lexer("1 / (" * depth + "2" + ")" * depth)).parse()
+        self.assertIsInstance(optimize(ast), BinOp)
+
+
+if __name__ == "__main__":
+    unittest.main()
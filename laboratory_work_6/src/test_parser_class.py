@@ -0,0 +1,59 @@
+import random
+import unittest
+from lexer import Lexer
+from parser_class import BinOp, Num, Parser, PrecedenceParser
+
+
+def random_expression(rng, depth):
+    """A random valid expression with parentheses nested up to `depth` levels."""
+    if depth == 0 or rng.random() < 0.3:
+        return str(rng.randrange(100))
+    parts = [random_expression(rng, depth - 1)]
+    for _ in range(rng.randint(1, 3)):
+        parts.append(rng.choice(" + - * / ".split()))
+        parts.append(random_expression(rng, depth - 1))
+    expression = " ".join(parts)
+    return f"({expression})" if rng.random() < 0.5 else expression
+
+
+def as_tuple(node):
+    """The AST as nested tuples of values and operators."""
+    if isinstance(node, Num):
+        return node.value
+    return (as_tuple(node.left), node.op.value, as_tuple(node.right))
+
+
+class TestPrecedenceParser(unittest.TestCase):
+    def test_same_ast_as_parser(self):
+        """Test of the precedence parser building the AST of the recursive parser."""
+        rng = random.Random(0)
+        for _ in range(200):
+            text = random_expression(rng, 4)
+            self.assertEqual(as_tuple(PrecedenceParser(Lexer(text)).parse()), as_tuple(Parser(Lexer(text)).parse()), text)
+
+    def test_associativity(self):
+        """Test of operators of the same precedence grouping to the left."""
+        self.assertEqual(as_tuple(PrecedenceParser(Lexer("8 / 4 / 2 - 1 - 1")).parse()),
+                         ((((8, "/", 4), "/", 2), "-", 1), "-", 1))
+
+    def test_deep_nesting(self):
+        """Test of parsing 100000 nested parentheses."""
+        depth = 100_000
+        node = PrecedenceParser(Lexer("(" * depth + "7" + ")" * depth)).parse()
+        self.assertEqual(node.value, 7)
+        node = PrecedenceParser(Lexer("1 - (" * depth + "2" + ")" * depth)).parse()
+        for _ in range(depth):
+            self.assertIsInstance(node, BinOp)
+            self.assertEqual(node.left.value, 1)
+            node = node.right
+        self.assertEqual(node.value, 2)
+
+    def test_invalid_syntax(self):
+        """Test of the exception raised on missing operands and parentheses."""
+        for text in ("", "1 +", "* 2", "(1 + 2", "()"):
+            with self.assertRaises(Exception):
+                PrecedenceParser(Lexer(text)).parse()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import random
+import tempfile
+import unittest
+from lexer import Lexer
+from parser_class import Parser
+from token_buffer import TokenBuffer
+from tokenner import Tokenner, TokenType
+
+
+class TestTokenBuffer(unittest.TestCase):
+    def test_same_tokens_as_lexer(self):
+        """Test of the buffer holding the tokens of the lexer."""
+        rng = random.Random(0)
+        text = "".join(rng.choice(["12", "7", "+", "-", "*", "/", "(", ")", " ", "\n", "345"]) for _ in range(1000))
+        buffer = TokenBuffer(text)
+        self.assertEqual(list(buffer), Lexer(text).tokens)
+        self.assertEqual(len(buffer), len(Lexer(text).tokens))
+
+    def test_views(self):
+        """Test of reading token types and texts without building tokens."""
+        buffer = TokenBuffer(" 42 *(7")
+        self.assertEqual([buffer.type(i) for i in range(len(buffer))],
+                         [TokenType.INTEGER, TokenType.MUL, TokenType.LPAREN, TokenType.INTEGER, TokenType.EOF])
+        self.assertEqual(buffer.text(0), "42")
+        self.assertEqual((buffer.starts[1], buffer.ends[1]), (4, 5))
+        self.assertEqual(buffer[-2], Tokenner(TokenType.INTEGER, 7))
+
+    def test_parser(self):
+        """Test of parsing the tokens of a buffer."""
+        buffer = TokenBuffer("3 * (12 + 4)")
+        ast = Parser(buffer).parse()
+        self.assertEqual(ast.op, Tokenner(TokenType.MUL, "*"))
+        self.assertEqual(ast.right.left.value, 12)
+        self.assertEqual(buffer.get_next_token(), Tokenner(TokenType.EOF, None))
+
+    def test_large_integer(self):
+        """Test of integers larger than 64 bits."""
+        buffer = TokenBuffer(f"{1 << 64} + 1")
+        self.assertEqual(buffer[0], Tokenner(TokenType.INTEGER, 1 << 64))
+        self.assertEqual(buffer[2], Tokenner(TokenType.INTEGER, 1))
+
+    def test_unknown_character(self):
+        """Test of the exception raised on an unknown character."""
+        with self.assertRaises(Exception):
+            TokenBuffer("1 + x")
+
+    def test_bytes(self):
+        """Test of tokenizing bytes and memoryviews like the text they encode."""
+        text = "723 + 3 * (120 / (12 / (3 + 1) - 1))\n  4500 -6"
+        self.assertEqual(list(TokenBuffer(text.encode())), Lexer(text).tokens)
+        buffer = TokenBuffer(memoryview(text.encode()))
+        self.assertEqual(list(buffer), Lexer(text).tokens)
+        self.assertEqual(bytes(buffer.text(0)), b"723")
+        with self.assertRaises(Exception):
+            TokenBuffer("1 + é".encode())
+
+    def test_from_file(self):
+        """Test of tokenizing a memory-mapped file."""
+        text = "12 * (3 - 45)\n" * 100
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "expression.txt")
+            with open(path, "w") as file:
+                file.write(text)
+            buffer = TokenBuffer.from_file(path)
+            self.assertEqual(list(buffer), Lexer(text).tokens)
+            buffer.close()
+            open(path, "w").close()
+            self.assertEqual(list(TokenBuffer.from_file(path)), [Tokenner(TokenType.EOF, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
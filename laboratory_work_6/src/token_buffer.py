@@ -0,0 +1,126 @@
+import mmap
+from array import array
+from lexer import BYTE_TOKEN_REGEX, TOKEN_REGEX
+from tokenner import Tokenner, TokenType
+
+
+# Token types by their one byte code and the codes by type
+TOKEN_TYPES = list(TokenType)
+TOKEN_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+INTEGER = TOKEN_CODES[TokenType.INTEGER]
+EOF = TOKEN_CODES[TokenType.EOF]
+
+
+class TokenBuffer:
+    """Class storing the tokens of a text as parallel arrays instead of one `Tokenner` per token.
+
+    Token i has the type code types[i], the text source[starts[i]:ends[i]] and, for integers, the value values[i],
+    so a token takes 25 bytes. `Tokenner` instances are only built when a token is asked for, and the buffer has
+    the `get_next_token` method of the lexers, so the `Parser` can consume it directly.
+    Integers not fitting in 64 bits are kept by their index in the `large` dictionary.
+
+    The text can also be bytes, a memoryview or an mmap, matched with `BYTE_TOKEN_REGEX` without decoding it.
+    Integers are then converted from the bytes of their match and `text` returns bytes.
+    """
+    __slots__ = ("source", "types", "values", "starts", "ends", "large", "pos")
+
+    def __init__(self, text):
+        self.source = text
+        self.types = array("B")
+        self.values = array("q")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.large = {}
+        self.pos = 0
+        self.tokenize()
+
+    def __str__(self):
+        """String representation of the class instance."""
+        return f"TokenBuffer({len(self)} tokens)"
+
+    def __repr__(self):
+        """String representation of the class instance."""
+        return self.__str__()
+
+    def tokenize(self):
+        """Tokenize the entire input text into the arrays."""
+        types, values, starts, ends = self.types, self.values, self.starts, self.ends
+        regex = TOKEN_REGEX if isinstance(self.source, str) else BYTE_TOKEN_REGEX
+        codes = {kind: TOKEN_CODES[TokenType[kind]] for kind in regex.groupindex if kind in TokenType.__members__}
+        for mo in regex.finditer(self.source):
+            kind = mo.lastgroup
+            if kind == 'WHITESPACE':
+                continue
+            elif kind == 'UNKNOWN':
+                value = mo.group()
+                raise Exception(f'Unexpected character: {value if isinstance(value, str) else value.decode("latin-1")}')
+            code = codes[kind]
+            value = 0
+            if code == INTEGER:
+                value = int(mo.group())
+                if not -1 << 63 <= value < 1 << 63:
+                    self.large[len(types)] = value
+                    value = 0
+            types.append(code)
+            values.append(value)
+            starts.append(mo.start())
+            ends.append(mo.end())
+        types.append(EOF)
+        values.append(0)
+        starts.append(len(self.source))
+        ends.append(len(self.source))
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i):
+        """Build the `Tokenner` of the token i."""
+        token_type = TOKEN_TYPES[self.types[i]]
+        if token_type == TokenType.INTEGER:
+            i %= len(self.types)
+            return Tokenner(token_type, self.large[i] if i in self.large else self.values[i])
+        elif token_type == TokenType.EOF:
+            return Tokenner(token_type, None)
+        value = self.source[self.starts[i]:self.ends[i]]
+        return Tokenner(token_type, value if isinstance(value, str) else bytes(value).decode("ascii"))
+
+    @classmethod
+    def from_file(cls, path):
+        """Tokenize a file through a read-only memory map, without reading it into memory.
+        The map stays open as the source of the buffer, until `close` is called.
+        """
+        with open(path, "rb") as file:
+            try:
+                source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                source = b""
+        try:
+            return cls(source)
+        except Exception:
+            if isinstance(source, mmap.mmap):
+                source.close()
+            raise
+
+    def close(self):
+        """Close the memory map of a buffer made by `from_file`."""
+        if isinstance(self.source, mmap.mmap):
+            self.source.close()
+
+    def type(self, i):
+        """Return the type of the token i without building it."""
+        return TOKEN_TYPES[self.types[i]]
+
+    def text(self, i):
+        """Return the source text of the token i."""
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def get_next_token(self):
+        """Return the next token from the buffer."""
+        if self.pos < len(self.types):
+            token = self[self.pos]
+            self.pos += 1
+            return token
+        else:
+            return Tokenner(TokenType.EOF, None)
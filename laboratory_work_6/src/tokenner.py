@@ -15,6 +15,8 @@ class TokenType(str, Enum):
 
 
 class Tokenner:
+    __slots__ = ("type", "value")
+
     def __init__(self, type, value):
         self.type = type
         self.value = value